@@ -16,12 +16,21 @@ import sys
 import pickle as cPickle
 from workflow import Workflow
 
-import glob
 import os.path
+import re
+import time
+import errno
+import fcntl
+import shutil
+import hashlib
+import tempfile
 import platform
+import subprocess
+import multiprocessing
 import youtube_dl # version 2021.1.16 (i.e. the latest version of youtube_dl at the time of the development of this software) (simply reinstall youtube_dl to make sure to have the latest version: "pip uninstall youtube_dl" and then "pip install youtube_dl") (or install the specific youtube_dl version using "pip install 'youtube_dl==2021.1.16' --force-reinstall" (cf.: "Installing specific package versions with pip", https://stackoverflow.com/questions/5226311/installing-specific-package-versions-with-pip))
 import applescript # (pip install applescript)
 import moviepy.editor # for extracting ".mp3" audio file from ".mp4" video file
+from moviepy.config import get_setting # for getting the path of the ffmpeg binary used by moviepy
 from pathlib import Path # for eventually getting the parent directory of the video file
 from termcolor import colored # (pip install termcolor)
 from validator_collection import checkers # to validate URLs (pip install validator-collection)
@@ -40,32 +49,199 @@ display_debug_prints = False
 # Setting the DOWNLOAD_DIRECTORY
 DOWNLOAD_DIRECTORY = '/Users/anthony/Downloads' # name of the folder in which we will put the downloaded video file (this can be adjusted by the user)
 
-# Moving to the "Downloads" directory
-os.chdir(DOWNLOAD_DIRECTORY)
+# Directory in which the workspace of the job is created, i.e. the temporary directory receiving the intermediate files (downloaded video(s), ".part" files, ".mp3" conversion) until the ".mp3" file(s) are moved to DOWNLOAD_DIRECTORY (None for the system temporary directory, e.g. a tmpfs such as "/dev/shm" to keep them in memory)
+WORKSPACE_DIRECTORY = None
+
+# Name of the lock file of every workspace (locked by the job using the workspace, cf.: JobWorkspace)
+WORKSPACE_LOCK_FILE_NAME = '.dmus-job.lock'
+
+# ffmpeg binary used by moviepy (also used directly for the audio-only extraction)
+FFMPEG_BINARY = get_setting('FFMPEG_BINARY')
+
+# Boolean value to also write the URL in the Finder "Comments" of the ".mp3" file(s) on macOS (it is always written in their ID3 "Comments" frame)
+write_finder_comments = True
+
+# Boolean value to stream the audio of the videos straight from the network into the ".mp3" encoder (without writing the video files to disk), whenever their media URLs can be read by ffmpeg
+streaming_mode = True
+
+# Protocols of the youtube_dl formats whose media URLs can be read directly by ffmpeg
+streamable_protocols = ['http', 'https', 'm3u8', 'm3u8_native']
+
+# Name of the workflow datastore checkpointing the ".part" file(s) of the interrupted downloads (video URL --> ".part" file path --> bytes received so far), so that the next run resumes them with HTTP range requests instead of starting from zero
+partial_downloads_datastore = 'partial_downloads'
+
+# Number of bytes received between two checkpoints of a ".part" file
+checkpoint_interval = 4 * 1024 * 1024
+
+# Number of worker processes extracting the audio of the videos of a post at the same time (None: as many as there are CPU cores)
+extraction_workers = None
+
+# Audio codecs that can be copied without transcoding into each audio file format
+stream_copy_codecs = {
+    '.mp3': ['mp3'],
+    '.m4a': ['aac', 'alac'],
+    '.opus': ['opus'],
+    '.ogg': ['vorbis', 'opus'],
+}
 
 
 
 
 ## Functions
 
-def video_downloader(url):
+class JobWorkspace(object):
+    """
+    Workspace of the job, i.e. the temporary directory receiving its intermediate files (downloaded video(s), ".part" files, ".mp3" conversion) until its ".mp3" file(s) are moved, atomically, to their destination directory
+    The workspace of a video URL is always the same directory, so that the ".part" file(s) left by an interrupted download are resumed by the next run: it is removed once the job completes, unless it still holds ".part" files
+    The job holds an exclusive lock on the lock file of its workspace (cf.: WORKSPACE_LOCK_FILE_NAME), so that a job processing the same video URL at the same time (e.g. another Alfred run) works in a new temporary directory instead (which no other job ever resumes, so it is always removed once the job completes)
+    (Used as a context manager: "with JobWorkspace(url, DOWNLOAD_DIRECTORY) as workspace:")
+    """
+
+    def __init__(self, key, destination_directory, parent_directory=None):
+        self.key = key
+        self.destination_directory = destination_directory
+        self.parent_directory = parent_directory or WORKSPACE_DIRECTORY or tempfile.gettempdir()
+        self.path = os.path.join(self.parent_directory, 'dmus-job-' + hashlib.sha1(to_unicode(key).encode('utf-8')).hexdigest()[:16])
+        self.resumable = True
+        self.lock_file = None
+
+    def __enter__(self):
+        self.lock_file = lock_workspace(self.path)
+        self.resumable = self.lock_file is not None
+        if not self.resumable: # (the same video URL processed twice at the same time)
+            self.path = tempfile.mkdtemp(prefix='dmus-job-', dir=self.parent_directory)
+            self.lock_file = lock_workspace(self.path)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if not self.resumable or not any(file_name.endswith('.part') for file_name in os.listdir(self.path)):
+                shutil.rmtree(self.path, ignore_errors=True) # (removed before the lock is released, so that no other job starts working in it in the meantime)
+        finally:
+            self.lock_file.close() # (releasing the lock)
+            self.lock_file = None
+        return False
+
+    def publish(self, file_path, file_name=None):
+        """
+        Moves a finished file of the workspace to the destination directory, atomically (i.e. the file never appears partially written): it is renamed in case both directories are on the same file system, and otherwise copied under a temporary name and then renamed
+
+        Args:
+            file_path (str): The absolute path of the file in the workspace
+            file_name (str): The name of the file in the destination directory (default: its current name)
+
+        Returns:
+            file_path_new (str): The absolute path of the file in the destination directory
+        """
+
+        file_path_new = os.path.join(self.destination_directory, file_name or os.path.basename(file_path))
+        try:
+            os.rename(file_path, file_path_new)
+            return file_path_new
+        except OSError as e:
+            if e.errno != errno.EXDEV: # (anything else than "Invalid cross-device link")
+                raise
+
+        file_descriptor, temporary_file_path = tempfile.mkstemp(prefix='.dmus-', suffix='.tmp', dir=self.destination_directory)
+        os.close(file_descriptor)
+        try:
+            shutil.copy2(file_path, temporary_file_path)
+            os.rename(temporary_file_path, file_path_new)
+        except Exception:
+            os.remove(temporary_file_path)
+            raise
+        os.remove(file_path)
+
+        return file_path_new
+
+
+def lock_workspace(path):
+    """
+    Creates a workspace directory (unless it exists) and takes the exclusive lock of its lock file, without waiting (cf.: "fcntl.flock" in https://docs.python.org/3/library/fcntl.html)
+
+    Args:
+        path (str): The absolute path of the workspace
+
+    Returns:
+        lock_file (file): The open lock file holding the lock (released when it is closed), or None in case another job holds the lock
+    """
+
+    lock_file_path = os.path.join(path, WORKSPACE_LOCK_FILE_NAME)
+    while True:
+        try:
+            os.makedirs(path)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+        try:
+            lock_file = open(lock_file_path, 'ab')
+        except IOError as e:
+            if e.errno == errno.ENOENT: # (the workspace was removed in the meantime by the job which used it)
+                continue
+            raise
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except IOError as e:
+            lock_file.close()
+            if e.errno in (errno.EAGAIN, errno.EACCES, errno.EWOULDBLOCK):
+                return None
+            raise
+        # Making sure the workspace was not removed by the job which held the lock until now (the lock being then taken on a deleted lock file)
+        try:
+            if os.fstat(lock_file.fileno()).st_ino == os.stat(lock_file_path).st_ino:
+                return lock_file
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                lock_file.close()
+                raise
+        lock_file.close()
+
+
+def video_downloader(url, wf=None, download_directory=None):
     """
     Uses the youtube_dl Python package to download the ".mp4" video file(s) from a URL
     Cf.: https://www.bogotobogo.com/VideoStreaming/YouTube/youtube-dl-embedding.php
 
     Args:
         url (str): The URL of the video
+        wf (Workflow): The workflow in whose data the ".part" file(s) are checkpointed (None: no checkpoint)
+        download_directory (str): The directory in which the video file(s) are downloaded, e.g. the workspace of the job (default: DOWNLOAD_DIRECTORY)
 
     Returns:
         video_paths_list (list): List containing the absolute file path(s) of the downloaded video file(s)
     """
 
-    # Getting the number of ".mp4" files preliminarily (i.e. before downloading the ".mp4" video files) situated in the DOWNLOAD_DIRECTORY
-    number_mp4_DOWNLOAD_DIRECTORY_before_download = len(glob.glob1(DOWNLOAD_DIRECTORY, "*.mp4"))
+    # Collecting the path of every file written by youtube_dl for the current URL (cf.: "progress_hooks" in https://github.com/ytdl-org/youtube-dl/blob/master/youtube_dl/YoutubeDL.py)
+    video_file_path_list = []
+
+    # Checkpointing the ".part" file(s) being downloaded (youtube_dl resumes them by itself as long as they are still there)
+    partial_downloads = (wf.stored_data(partial_downloads_datastore) or {}) if wf is not None else {}
+    part_files = partial_downloads.setdefault(url, {})
+    checkpointed_bytes = dict(part_files)
+
+    def record_downloaded_file(d):
+        if d['status'] == 'downloading' and wf is not None and d.get('tmpfilename'):
+            part_file_path = os.path.abspath(d['tmpfilename'])
+            downloaded_bytes = d.get('downloaded_bytes') or 0
+            if downloaded_bytes - checkpointed_bytes.get(part_file_path, 0) >= checkpoint_interval:
+                part_files[part_file_path] = checkpointed_bytes[part_file_path] = downloaded_bytes
+                wf.store_data(partial_downloads_datastore, partial_downloads, serializer='json')
+        if d['status'] == 'finished':
+            video_file_path = os.path.abspath(d['filename'])
+            if video_file_path not in video_file_path_list:
+                video_file_path_list.append(video_file_path)
+            if part_files.pop(video_file_path + '.part', None) is not None: # (cf.: FileDownloader.temp_name in https://github.com/ytdl-org/youtube-dl/blob/master/youtube_dl/downloader/common.py)
+                if not part_files:
+                    del partial_downloads[url]
+                wf.store_data(partial_downloads_datastore, partial_downloads, serializer='json')
 
     ydl_opts = {
         'format': 'bestautio/best', #'mp4', #'bestautio/best'
         'quiet': True,
+        'outtmpl': os.path.join(download_directory or DOWNLOAD_DIRECTORY, '%(title)s-%(id)s.%(ext)s'),
+        'progress_hooks': [record_downloaded_file],
+        'continuedl': True, # resuming the interrupted downloads from their ".part" file with HTTP range requests...
+        'nopart': False, # ...which requires downloading into ".part" files (renamed once complete)
         # 'postprocessors': [{
         #     'key': 'FFmpegExtractAudio',
         #     'preferredcodec': 'mp3',
@@ -77,82 +253,242 @@ def video_downloader(url):
         if display_debug_prints:
             print(' returned_value: {0}'.format(returned_value))
 
-    # Getting the number of ".mp4" files situated in the DOWNLOAD_DIRECTORY after downloading the ".mp4" video file(s)
-    number_mp4_DOWNLOAD_DIRECTORY_after_download = len(glob.glob1(DOWNLOAD_DIRECTORY, "*.mp4"))
+    return returned_value, video_file_path_list
 
-    # Getting the number of downloaded ".mp4" video file(s)
-    number_of_downloaded_videos = number_mp4_DOWNLOAD_DIRECTORY_after_download - number_mp4_DOWNLOAD_DIRECTORY_before_download
 
-    # Getting (all) the new ".mp4" video file(s) of the current post
-    video_files = glob.glob(DOWNLOAD_DIRECTORY + "/*.mp4")
-    video_files.sort(key=os.path.getctime, reverse=True)
-    new_video_files = video_files[0:number_of_downloaded_videos]
-    video_file_path_list = []
-    for i in range(number_of_downloaded_videos):
-        video_file_path = new_video_files[i]
-        video_file_path_list.append(video_file_path)
+def has_partial_download(wf, url):
+    """
+    Checks whether an interrupted download of a video URL left ".part" file(s) to resume
 
-    return returned_value, video_file_path_list
+    Args:
+        wf (Workflow): The workflow in whose data the ".part" file(s) are checkpointed
+        url (str): The URL of the video
+
+    Returns:
+        (bool): True in case (at least) one ".part" file of the URL is still on disk
+    """
 
+    part_files = (wf.stored_data(partial_downloads_datastore) or {}).get(url, {})
 
-def extract_audio(video_file_path_list):
+    return any(os.path.isfile(part_file_path) for part_file_path in part_files)
+
+
+def stream_audio_downloader(url, download_directory=None):
+    """
+    Uses the youtube_dl Python package to resolve the media URL(s) of the video(s) of a URL, and ffmpeg to download their audio stream and convert it into ".mp3" at once (i.e. without intermediate video file, the encoding overlapping the network transfer)
+
+    Args:
+        url (str): The URL of the video
+        download_directory (str): The directory in which the ".mp3" audio file(s) are written, e.g. the workspace of the job (default: DOWNLOAD_DIRECTORY)
+
+    Returns:
+        returned_value (int): "0" in case all the conversions succeeded (None in case the video(s) cannot be streamed, in which case nothing was downloaded)
+        audio_file_path_list (list): List containing the absolute file path(s) of the ".mp3" audio file(s)
+    """
+
+    ydl_opts = {
+        'format': 'bestaudio/best',
+        'quiet': True,
+        'outtmpl': os.path.join(download_directory or DOWNLOAD_DIRECTORY, '%(title)s-%(id)s.%(ext)s'),
+    }
+    with youtube_dl.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+        entries = [entry for entry in (info.get('entries') or [info]) if entry] # (an Instagram post containing several videos is a playlist)
+
+        # Making sure ffmpeg can read all the media URLs before converting anything
+        if any(entry.get('protocol') not in streamable_protocols or entry.get('acodec') == 'none' for entry in entries):
+            return None, []
+
+        returned_value = 0
+        audio_file_path_list = []
+        for entry in entries:
+            audio_file_path = os.path.splitext(ydl.prepare_filename(entry))[0] + '.mp3'
+            headers = ''.join('{0}: {1}\r\n'.format(key, value) for key, value in entry.get('http_headers', {}).items())
+            input_options = ['-headers', headers] if headers else []
+            if ffmpeg_extract_audio(entry['url'], audio_file_path, input_options) == 0:
+                audio_file_path_list.append(audio_file_path)
+            else:
+                returned_value = 1
+            if display_debug_prints:
+                print(' returned_value: {0} ({1})'.format(returned_value, audio_file_path))
+
+    return returned_value, audio_file_path_list
+
+
+def probe_audio_codec(video_file_path, input_options=None):
     """
-    Extracts ".mp3" audio file from ".mp4" video file
+    Identifies the codec of the first audio stream of a video file using ffmpeg (without decoding anything)
+
+    Args:
+        video_file_path (str): Video absolute file path (or media URL)
+        input_options (list): Additional ffmpeg options applying to the input (e.g. the HTTP headers of a media URL)
+
+    Returns:
+        audio_codec (str): The name of the audio codec (e.g. "aac", "mp3", "opus") or None in case no audio stream was found
+    """
+
+    process = subprocess.Popen([FFMPEG_BINARY, '-hide_banner'] + (input_options or []) + ['-i', video_file_path], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    _, stderr = process.communicate() # ffmpeg prints the streams description to stderr (and exits with an error since no output file is given)
+    match = re.search(r'Stream #\d+:\d+.*?: Audio: (\w+)', stderr.decode('utf-8', 'replace'))
+
+    return match.group(1) if match else None
+
+
+def ffmpeg_extract_audio(video_file_path, audio_file_path, input_options=None):
+    """
+    Writes the audio stream of a video file to an audio file with ffmpeg, copying the audio stream as is (i.e. without transcoding) whenever the target audio format supports its codec and otherwise only decoding the audio stream (i.e. never the video frames)
+
+    Args:
+        video_file_path (str): Video absolute file path (or media URL, ffmpeg then downloading and converting the audio stream at once)
+        audio_file_path (str): Audio absolute file path (its extension determines the target audio format)
+        input_options (list): Additional ffmpeg options applying to the input (e.g. the HTTP headers of a media URL)
+
+    Returns:
+        returned_value (int): The ffmpeg return code ("0" in case the extraction succeeded)
+    """
+
+    audio_codec = probe_audio_codec(video_file_path, input_options)
+    if audio_codec is None:
+        return 1
+
+    target_extension = os.path.splitext(audio_file_path)[1].lower()
+    if audio_codec in stream_copy_codecs.get(target_extension, []):
+        codec_options = ['-c:a', 'copy']
+    else:
+        codec_options = ['-c:a', 'libmp3lame', '-q:a', '5'] if target_extension == '.mp3' else []
+
+    command = [FFMPEG_BINARY, '-y', '-loglevel', 'error'] + (input_options or []) + ['-i', video_file_path, '-vn', '-map', '0:a:0'] + codec_options + [audio_file_path]
+
+    return subprocess.call(command)
+
+
+def extract_single_audio(video_file_path):
+    """
+    Extracts ".mp3" audio file from a ".mp4" video file
     Cf.: https://www.codespeedy.com/extract-audio-from-video-using-python/
 
     Args:
-        video_file_path_list (list): List containing (all) the downloaded video absolute file path(s)
+        video_file_path (str): Video absolute file path
 
     Returns:
-        no_error (int): Number equal to "1" in case there is no error and "0" in case (at least one of) the conversion(s) failed
+        no_error (int): Number equal to "1" in case there is no error and "0" in case the conversion failed
+        elapsed_time (float): The time spent on the conversion in seconds
     """
 
+    start_time = time.time()
     no_error = 1
 
-    for video_file_path in video_file_path_list:
-
+    try:
+        # Composing absolute audio file path
+        audio_file_path = video_file_path.replace('.mp4', '.mp3')
+        # Extracting the audio stream directly with ffmpeg (stream copy or audio-only transcoding)
         try:
-            # Creating video object
+            returned_value = ffmpeg_extract_audio(video_file_path, audio_file_path)
+        except OSError: # ffmpeg binary not found
+            returned_value = 1
+        if returned_value != 0:
+            # Falling back on moviepy (creating video object, retrieving audio object from video object and writing audio file)
             video = moviepy.editor.VideoFileClip(video_file_path)
-            # Retrieving audio object from video object
             audio = video.audio
-            # Composing absolute audio file path
-            audio_file_path = video_file_path.replace('.mp4', '.mp3')
-            # Writing audio file
             audio.write_audiofile(audio_file_path, logger=None) # Cf.: "Moviepy still prints a progress bar even after setting `verbose` to `False`" (https://stackoverflow.com/questions/42695735/moviepy-still-prints-a-progress-bar-even-after-setting-verbose-to-false)
-            if display_debug_prints:
-                # Printing success message
-                print(' ✅ ".mp3" of "{0}" successfully extracted!'.format(video_file_path))
+        if display_debug_prints:
+            # Printing success message
+            print(' ✅ ".mp3" of "{0}" successfully extracted!'.format(video_file_path))
+        no_error *= 1
+
+    except Exception as e:
+        colored_error_message = colored('"{0}" could not be converted into ".mp3"!'.format(video_file_path), 'red', attrs=['reverse', 'blink'])
+        if display_debug_prints:
+            print(' ❌ ERROR! ' + colored_error_message + '\n Error message:\n  {0}'.format(e))
+        no_error *= 0
+
+    return no_error, time.time() - start_time
+
+
+def extract_audio(video_file_path_list, workers=None):
+    """
+    Extracts ".mp3" audio files from ".mp4" video files (in parallel, with a pool of processes, when there are several video files)
+
+    Args:
+        video_file_path_list (list): List containing (all) the downloaded video absolute file path(s)
+        workers (int): The number of worker processes (by default, "extraction_workers" or the number of CPU cores if it is None)
+
+    Returns:
+        no_error (int): Number equal to "1" in case there is no error and "0" in case (at least one of) the conversion(s) failed
+    """
+
+    no_error = 1
+
+    if workers is None:
+        workers = extraction_workers or multiprocessing.cpu_count()
+    workers = min(workers, len(video_file_path_list))
+
+    if workers > 1:
+        pool = multiprocessing.Pool(processes=workers)
+        try:
+            results = pool.map(extract_single_audio, video_file_path_list, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = [extract_single_audio(video_file_path) for video_file_path in video_file_path_list]
+
+    for video_file_path, (file_no_error, elapsed_time) in zip(video_file_path_list, results):
+        if display_debug_prints:
+            print(' ⏱ "{0}" processed in {1:.2f}[s]'.format(video_file_path, elapsed_time))
+        no_error *= file_no_error
+
+    return no_error
+
+
+def add_metadata(url, video_file_path_list, no_error, finder_comments=True):
+    """
+    Writes comment in metadata "Comments" part of file (as ID3 comment of every ".mp3" file and, on macOS, as Finder comment of all the files at once)
+
+    Args:
+        url (str): The URL of the video
+        video_file_path_list (list): List containing (all) the downloaded video absolute file path(s)
+        finder_comments (bool): Boolean value to also write the Finder comments (cf.: add_finder_comments, the Finder comments being lost when a file is copied to another file system)
+    """
+
+    audio_file_path_list = [video_file_path.replace('.mp4', '.mp3') for video_file_path in video_file_path_list]
+
+    for audio_file_path in audio_file_path_list:
+
+        try:
+            # Writing comment in ID3 "Comments" frame of the current ".mp3" file
+            write_id3_comment(audio_file_path, url)
             no_error *= 1
 
         except Exception as e:
-            colored_error_message = colored('"{0}" could not be converted into ".mp3"!'.format(video_file_path), 'red', attrs=['reverse', 'blink'])
+            colored_error_message = colored('URL could NOT be written to metadata "Comments" part of "{0}"!'.format(audio_file_path), 'red', attrs=['reverse', 'blink'])
             if display_debug_prints:
                 print(' ❌ ERROR! ' + colored_error_message + '\n Error message:\n  {0}'.format(e))
             no_error *= 0
 
+    if finder_comments:
+        no_error = add_finder_comments(url, audio_file_path_list, no_error)
+
     return no_error
 
 
-def add_metadata(url, video_file_path_list, no_error):
+def add_finder_comments(url, audio_file_path_list, no_error):
     """
-    Writes comment in metadata "Comments" part of file
+    Writes comment in Finder "Comments" of all the ".mp3" files at once (on macOS only, cf.: write_finder_comments)
 
     Args:
         url (str): The URL of the video
-        video_file_path_list (list): List containing (all) the downloaded video absolute file path(s)
+        audio_file_path_list (list): List containing (all) the ".mp3" audio absolute file path(s)
     """
 
-    for video_file_path in video_file_path_list:
-        audio_file_path = video_file_path.replace('.mp4', '.mp3')
+    if write_finder_comments and audio_file_path_list and platform.system() == 'Darwin':
 
         try:
-            # Writing comment in metadata "Comments" part of the current ".mp3" file
-            write_metadata_comment(audio_file_path, url)
-            no_error *= 1
+            # Writing comment in Finder "Comments" of (all) the ".mp3" file(s)
+            write_metadata_comments(audio_file_path_list, url)
 
         except Exception as e:
-            colored_error_message = colored('URL could NOT be written to metadata "Comments" part of "{0}"!'.format(audio_file_path), 'red', attrs=['reverse', 'blink'])
+            colored_error_message = colored('URL could NOT be written to Finder "Comments" of {0}!'.format(audio_file_path_list), 'red', attrs=['reverse', 'blink'])
             if display_debug_prints:
                 print(' ❌ ERROR! ' + colored_error_message + '\n Error message:\n  {0}'.format(e))
             no_error *= 0
@@ -160,21 +496,48 @@ def add_metadata(url, video_file_path_list, no_error):
     return no_error
 
 
-def write_metadata_comment(file_path, comment):
+def to_unicode(value):
+    """
+    Decodes a UTF-8 byte string (Python 2 "str") into a unicode string, leaving unicode strings as they are
     """
-    Writes comment in metadata "Comments" part of file (in case the operating system on which the program is running is macOS)
+
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def write_id3_comment(file_path, comment):
+    """
+    Writes comment in the ID3 "Comments" (COMM) frame of a ".mp3" file, directly in the file (works on any operating system)
 
     Args:
-        file_path (str): The absolute video file path
-        comment (str): The comment to insert in the metadata "Comments" part of the video file
+        file_path (str): The absolute audio file path
+        comment (str): The comment to insert in the ID3 "Comments" frame of the audio file
     """
 
-    if platform.system() == 'Darwin':
-        script = 'set comment of (POSIX file "{0}" as alias) to "{1}" as Unicode text'.format(file_path, comment) # cf.: "Try to define your string as unicode: u'Nom du professeur’" (https://www.odoo.com/forum/help-1/unicodedecodeerror-ascii-codec-can-t-decode-byte-0xc3-in-position-27-ordinal-not-in-range-128-20737)
-        applescript.tell.app("Finder", script.decode('utf-8'))
-    else:
-        if display_debug_prints:
-            print(colored("Error!", 'red'), 'Writing comment in metadata "Comments" part of file is currently ONLY supported for macOS.')
+    from mutagen.id3 import ID3, COMM, ID3NoHeaderError # (pip install mutagen)
+
+    try:
+        tags = ID3(file_path)
+    except ID3NoHeaderError:
+        tags = ID3()
+    tags.delall('COMM')
+    tags.add(COMM(encoding=3, lang='eng', desc=u'', text=[to_unicode(comment)])) # encoding=3: UTF-8
+    tags.save(file_path)
+
+
+def write_metadata_comments(file_path_list, comment):
+    """
+    Writes comment in Finder "Comments" of files with one single AppleScript call (i.e. one single Apple Event round trip whatever the number of files)
+
+    Args:
+        file_path_list (list): List containing the absolute audio file path(s)
+        comment (str): The comment to insert in the Finder "Comments" of the audio files
+    """
+
+    def quote(value):
+        return u'"{0}"'.format(to_unicode(value).replace(u'\\', u'\\\\').replace(u'"', u'\\"'))
+
+    script = u'\n'.join(u'set comment of (POSIX file {0} as alias) to {1} as Unicode text'.format(quote(file_path), quote(comment)) for file_path in file_path_list) # cf.: "Try to define your string as unicode: u'Nom du professeur’" (https://www.odoo.com/forum/help-1/unicodedecodeerror-ascii-codec-can-t-decode-byte-0xc3-in-position-27-ordinal-not-in-range-128-20737)
+    applescript.tell.app("Finder", script)
 
 
 
@@ -226,53 +589,64 @@ def main(wf):
         returned_value = 0
         video_file_path_list = []
 
-        # 3) Downloading ".mp4" video file(s) using youtube_dl in DOWNLOAD_DIRECTORY
-        if display_debug_prints:
-            print('3) Downloading ".mp4" video file using youtube_dl in {0}'.format(DOWNLOAD_DIRECTORY))
-        try:
-            returned_value, video_file_path_list = video_downloader(url)
-        except Exception as e:
-            colored_error_message = colored('Audio download using youtube_dl failed... (Make sure you are connected to Internet!)', 'red', attrs=['reverse', 'blink'])
+        # 3) Streaming the ".mp3" audio file(s) or, if the video(s) cannot be streamed, downloading ".mp4" video file(s) using youtube_dl in the workspace of the job
+        with JobWorkspace(url, DOWNLOAD_DIRECTORY) as workspace:
             if display_debug_prints:
-                print('❌ ERROR! ' + colored_error_message + '\n Error message:\n  {0}'.format(e))
-            #------- output {query} message -------
-            print('❌ ERROR! Video download failed...')
-            #--------------------------------------
-            # Exiting the program
-            exit(1)
-        if returned_value != 0:
-            colored_error_message = colored('Audio download using youtube_dl failed... (/!\ returned_value !=0) (Make sure you are connected to Internet!)', 'red', attrs=['reverse', 'blink'])
+                print('3) Downloading ".mp4" video file using youtube_dl in {0}'.format(workspace.path))
+            streamed = False
+            try:
+                if streaming_mode and not (workspace.resumable and has_partial_download(wf, url)): # (a stream cannot be resumed, contrary to an interrupted download)
+                    returned_value, video_file_path_list = stream_audio_downloader(url, workspace.path) # (the list then contains the ".mp3" audio file path(s))
+                    streamed = returned_value is not None
+                if not streamed:
+                    returned_value, video_file_path_list = video_downloader(url, wf if workspace.resumable else None, workspace.path) # (the ".part" file(s) of a temporary workspace are removed with it, so they are not checkpointed)
+            except Exception as e:
+                colored_error_message = colored('Audio download using youtube_dl failed... (Make sure you are connected to Internet!)', 'red', attrs=['reverse', 'blink'])
+                if display_debug_prints:
+                    print('❌ ERROR! ' + colored_error_message + '\n Error message:\n  {0}'.format(e))
+                #------- output {query} message -------
+                print('❌ ERROR! Video download failed...')
+                #--------------------------------------
+                # Exiting the program
+                exit(1)
+            if returned_value != 0:
+                colored_error_message = colored('Audio download using youtube_dl failed... (/!\ returned_value !=0) (Make sure you are connected to Internet!)', 'red', attrs=['reverse', 'blink'])
+                if display_debug_prints:
+                    print('❌ ERROR! ' + colored_error_message)
+                #------- output {query} message -------
+                print('❌ ERROR! Video download failed...')
+                #--------------------------------------
+                # Exiting the program
+                exit(1)
+
+            if streamed:
+                no_error = 1
+            else:
+                # 4) Extracting the ".mp3" audio file(s) from the downloaded ".mp4" video file(s) in the workspace of the job
+                if display_debug_prints:
+                    print('4) Extracting ".mp3"')
+                no_error = extract_audio(video_file_path_list)
+
+                # 5) Deleting the downloaded video file(s)
+                if display_debug_prints:
+                    print('5) Deleting the downloaded video files')
+                for video_file_path in video_file_path_list:
+                    os.remove(video_file_path)
+
+            # 6) Writing URL to metadata "Comments" part of the converted ".mp3" file(s)
             if display_debug_prints:
-                print('❌ ERROR! ' + colored_error_message)
-            #------- output {query} message -------
-            print('❌ ERROR! Video download failed...')
-            #--------------------------------------
-            # Exiting the program
-            exit(1)
-        
-        # 4) Extracting the ".mp3" audio file(s) from the downloaded ".mp4" video file(s) in the DOWNLOAD_DIRECTORY
-        if display_debug_prints:
-            print('4) Extracting ".mp3"')
-        no_error = extract_audio(video_file_path_list)
-
-        # 5) Deleting the downloaded video file(s)
-        if display_debug_prints:
-            print('5) Deleting the downloaded video files')
-        for video_file_path in video_file_path_list:
-            os.remove(video_file_path)
-
-        # 6) Writing URL to metadata "Comments" part of the converted ".mp3" file(s)
-        if display_debug_prints:
-            print('6) Writing URL to metadata "Comments" part of the converted ".mp3" file(s)')
-        no_error = add_metadata(url, video_file_path_list, no_error)
+                print('6) Writing URL to metadata "Comments" part of the converted ".mp3" file(s)')
+            no_error = add_metadata(url, video_file_path_list, no_error, finder_comments=False) # (written once the files are moved to DOWNLOAD_DIRECTORY)
 
-        # 7) Cleaning the name of the downloaded ".mp3" file(s)
-        if display_debug_prints:
-            print('7) Cleaning the name(s) of the downloaded ".mp3" file(s)')
-        for video_file_path in video_file_path_list:
-            audio_file_path = video_file_path.replace('.mp4', '.mp3')
-            audio_file_path_new = audio_file_path.split('.mp3')[0][0:len(audio_file_path)-16] + '.mp3'
-            os.rename(audio_file_path, audio_file_path_new)
+            # 7) Moving the ".mp3" file(s) to DOWNLOAD_DIRECTORY under a clean name
+            if display_debug_prints:
+                print('7) Moving the ".mp3" file(s) to {0} under a clean name'.format(DOWNLOAD_DIRECTORY))
+            audio_file_path_new_list = []
+            for video_file_path in video_file_path_list:
+                audio_file_path = video_file_path.replace('.mp4', '.mp3')
+                audio_file_name = os.path.basename(audio_file_path)
+                audio_file_path_new_list.append(workspace.publish(audio_file_path, audio_file_name[0:len(audio_file_name)-16] + '.mp3'))
+            no_error = add_finder_comments(url, audio_file_path_new_list, no_error)
 
         if no_error and returned_value==0:
             #------- output {query} message -------
@@ -13,7 +13,7 @@
 import os
 
 # Workflow objects
-from .workflow import Workflow, manager
+from .workflow import FilterIndex, FilterPool, Workflow, manager
 from .workflow3 import Variables, Workflow3
 
 # Exceptions
@@ -67,6 +67,8 @@ __licence__ = 'MIT'
 __copyright__ = 'Copyright 2014-2019 Dean Jackson'
 
 __all__ = [
+    'FilterIndex',
+    'FilterPool',
     'Variables',
     'Workflow',
     'Workflow3',
@@ -22,11 +22,15 @@ up your Python script to best utilise the :class:`Workflow` object.
 from __future__ import print_function, unicode_literals
 
 import binascii
+from bisect import bisect
 import cPickle
 from copy import deepcopy
+import hashlib
+import heapq
 import json
 import logging
 import logging.handlers
+import multiprocessing
 import os
 import pickle
 import plistlib
@@ -35,6 +39,7 @@ import shutil
 import string
 import subprocess
 import sys
+import threading
 import time
 import unicodedata
 
@@ -799,6 +804,366 @@ class Item(object):
         return root
 
 
+class _FilterKey(object):
+    """Search key of an item for :meth:`Workflow.filter`.
+
+    Holds the key and the strings derived from it by the matching rules.
+    The lower-case key and its set of characters are computed at once
+    (every item needs them), the capitals and atoms on first use (only
+    the items that pass the character pre-filter need them).
+
+    :param value: search key (already stripped and, if need be, folded
+        to ASCII)
+    :type value: ``unicode``
+
+    """
+
+    __slots__ = ('value', 'lower', 'chars', '_capitals', '_atoms',
+                 '_initials')
+
+    def __init__(self, value):
+        """Create new :class:`_FilterKey` object."""
+        self.value = value
+        self.lower = value.lower()
+        self.chars = frozenset(self.lower)
+        self._capitals = None
+        self._atoms = None
+        self._initials = None
+
+    @property
+    def capitals(self):
+        """Capital letters and digits of the key (lower-cased)."""
+        if self._capitals is None:
+            self._capitals = ''.join([c for c in self.value
+                                      if c in INITIALS]).lower()
+        return self._capitals
+
+    @property
+    def atoms(self):
+        """Set of the "atoms" of the key (lower-cased)."""
+        if self._atoms is None:
+            atoms = [s.lower() for s in split_on_delimiters(self.value)]
+            self._atoms = frozenset(atoms)
+            self._initials = ''.join([s[0] for s in atoms if s])
+        return self._atoms
+
+    @property
+    def initials(self):
+        """Initials of the "atoms" of the key (lower-cased)."""
+        if self._initials is None:
+            self.atoms
+        return self._initials
+
+
+class FilterIndex(object):
+    """Precomputed search keys of a collection of items.
+
+    :meth:`Workflow.filter` derives several strings from the search key
+    of every item (lower-case, ASCII-folded, capitals, atoms, initials)
+    each time it is called. Build a :class:`FilterIndex` once from large
+    or long-lived collections and pass it to :meth:`~Workflow.filter` in
+    place of the items: the derived strings are then computed only once
+    and reused by every query, with identical results and scores.
+
+    .. note::
+
+        Local addition to the copy of Alfred-Workflow 1.39.0 vendored
+        with dmus, i.e. not part of any Alfred-Workflow release.
+
+    :param items: items to index
+    :type items: ``list`` or ``tuple``
+    :param key: function to get search key from ``items``.
+        Must return a ``unicode`` string. The default simply returns
+        the item.
+    :type key: ``callable``
+    :param batch: run :const:`MATCH_ALLCHARS` against all the search
+        keys at once (see :meth:`allchars_scores`) rather than item by
+        item. The default (``None``) batches it for collections of at
+        least :attr:`batch_min_items` items.
+    :type batch: ``Boolean``
+
+    """
+
+    #: Number of items from which :const:`MATCH_ALLCHARS` is batched
+    #: by default
+    batch_min_items = 10000
+
+    def __init__(self, items, key=lambda x: x, batch=None):
+        """Create new :class:`FilterIndex` object."""
+        self.items = list(items)
+        self.key = key
+        if batch is None:
+            batch = len(self.items) >= self.batch_min_items
+        #: Whether :const:`MATCH_ALLCHARS` is batched
+        self.batch = batch
+        #: Search key of every item (``None`` for empty keys)
+        self.keys = []
+        for item in self.items:
+            value = key(item).strip()
+            self.keys.append(_FilterKey(value) if value else None)
+        self._folded_keys = None
+        self._fingerprint = None
+
+    def __len__(self):
+        """Number of indexed items."""
+        return len(self.items)
+
+    def __iter__(self):
+        """Iterate over the indexed items."""
+        return iter(self.items)
+
+    def folded_keys(self, fold):
+        """ASCII-folded search key of every item (computed on first call).
+
+        :param fold: function converting a key to ASCII, e.g.
+            :meth:`Workflow.fold_to_ascii`
+        :type fold: ``callable``
+        :returns: list of search keys (``None`` for empty keys)
+        :rtype: ``list``
+
+        """
+        if self._folded_keys is None:
+            self._folded_keys = [
+                k if k is None or isascii(k.value)
+                else _FilterKey(fold(k.value))
+                for k in self.keys]
+        return self._folded_keys
+
+    def allchars_scores(self, keys, query, positions=None):
+        """Score of :const:`MATCH_ALLCHARS` for many search keys at once.
+
+        The rule searches each key for the case-insensitive regex
+        ``.*?q.*?u...``, i.e. for the first line of the key containing
+        the characters of ``query`` in order, as early as possible. Here
+        the keys are joined into one text and searched in a single pass
+        for the lines matching ``^[^qQ]*[qQ][^uU]*[uU]...``: the same
+        match (``re.IGNORECASE`` only ignores the case of ASCII letters),
+        found without trying every way of spreading ``query`` over the
+        line, so scores are identical.
+
+        :param keys: :attr:`keys` or :meth:`folded_keys`
+        :type keys: ``list``
+        :param query: lower-cased query word
+        :type query: ``unicode``
+        :param positions: positions of the keys to search (default: all)
+        :type positions: ``list``
+        :returns: ``{position: score}`` for the keys matching ``query``
+        :rtype: ``dict``
+
+        """
+        if positions is None:
+            positions = [i for i, k in enumerate(keys) if k is not None]
+
+        values = [keys[i].value for i in positions]
+        # start offset of every key in the text
+        offsets = []
+        offset = 0
+        for value in values:
+            offsets.append(offset)
+            offset += len(value) + 1
+        text = '\n'.join(values)
+
+        pattern = ['^']
+        for c in query:
+            if c in string.ascii_lowercase:
+                c = c + c.upper()
+            else:
+                c = re.escape(c)
+            pattern.append('[^{0}\n]*[{0}]'.format(c))
+        search = re.compile(''.join(pattern), re.MULTILINE).finditer
+
+        scores = {}
+        for match in search(text):
+            n = bisect(offsets, match.start()) - 1
+            if positions[n] in scores:  # not the first matching line
+                continue
+            start = match.start() - offsets[n]
+            end = match.end() - offsets[n]
+            scores[positions[n]] = 100.0 / ((1 + start) *
+                                            (end - start + 1))
+
+        return scores
+
+    @property
+    def fingerprint(self):
+        """Hash of the search keys (computed on first use).
+
+        Identifies the indexed collection across processes, e.g. to
+        check that the candidates saved by an incremental
+        :meth:`Workflow.filter` still refer to the same items.
+
+        :rtype: ``str``
+
+        """
+        if self._fingerprint is None:
+            values = [k.value if k is not None else '' for k in self.keys]
+            self._fingerprint = hashlib.sha1(
+                '\x00'.join(values).encode('utf-8')).hexdigest()
+        return self._fingerprint
+
+
+def _filter_worker(connection, items, key, batch):
+    """Run the filters of a :class:`FilterPool` worker process.
+
+    Receives the arguments of :meth:`FilterPool.search` through
+    ``connection`` and replies with the best results among ``items`` (the
+    shard of the worker), or with the exception raised. Items are replaced
+    by their positions in ``items``: the parent process has them already.
+
+    :param connection: end of the pipe to the parent process
+    :type connection: :class:`multiprocessing.Connection`
+    :param items: items of the shard
+    :type items: ``list``
+    :param key: function to get search key from ``items``
+    :type key: ``callable``
+    :param batch: ``batch`` of the :class:`FilterIndex` of the shard
+    :type batch: ``Boolean``
+
+    """
+    index = FilterIndex(range(len(items)), lambda n: key(items[n]), batch)
+    wf = Workflow()
+
+    while True:
+        try:
+            request = connection.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if request is None:
+            break
+
+        (query, match_on, fold_diacritics, min_score, max_results,
+         ascending) = request
+        try:
+            results = wf._filter_index(index, query, match_on,
+                                       fold_diacritics, min_score=min_score)
+            if max_results and len(results) > max_results:
+                # select the best results the way `Workflow.filter` does,
+                # i.e. comparing the items themselves on equal sort keys
+                results = [(k, (items[n], score, rule), n)
+                           for k, (n, score, rule) in results]
+                if ascending:
+                    results = heapq.nlargest(max_results, results)
+                else:
+                    results = heapq.nsmallest(max_results, results)
+                results = [(k, (n, score, rule))
+                           for k, (_, score, rule), n in results]
+        except Exception as err:
+            connection.send(err)
+        else:
+            connection.send(results)
+
+    connection.close()
+
+
+class FilterPool(object):
+    """Collection of items filtered in parallel by worker processes.
+
+    The items are split into as many shards as there are workers, each
+    worker keeping a :class:`FilterIndex` of its shard. Pass the pool to
+    :meth:`Workflow.filter` in place of the items: every worker filters
+    its shard and returns its best results, which are then merged, with
+    the same results and order as a serial filter.
+
+    The workers are started when the pool is created and reused by every
+    filter until :meth:`close` is called (or the process exits). They are
+    forked, so the items are never pickled, and only the positions and
+    scores of the best results are sent back.
+
+    .. note::
+
+        Local addition to the copy of Alfred-Workflow 1.39.0 vendored
+        with dmus, i.e. not part of any Alfred-Workflow release.
+
+    :param items: items to filter
+    :type items: ``list`` or ``tuple``
+    :param key: function to get search key from ``items``.
+        Must return a ``unicode`` string. The default simply returns
+        the item.
+    :type key: ``callable``
+    :param processes: number of worker processes. The default is the
+        number of CPUs.
+    :type processes: ``int``
+    :param batch: ``batch`` of the :class:`FilterIndex` of every shard
+    :type batch: ``Boolean``
+
+    """
+
+    def __init__(self, items, key=lambda x: x, processes=None, batch=None):
+        """Create new :class:`FilterPool` object and start its workers."""
+        self.items = list(items)
+        self.key = key
+        processes = processes or multiprocessing.cpu_count()
+        size = max(1, -(-len(self.items) // processes))
+        # ``(process, connection, position of the first item)`` of the
+        # worker of every shard
+        self._workers = []
+        self._lock = threading.Lock()
+        for start in range(0, len(self.items), size):
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_filter_worker,
+                args=(worker_connection, self.items[start:start + size],
+                      key, batch))
+            process.daemon = True
+            process.start()
+            worker_connection.close()
+            self._workers.append((process, connection, start))
+
+    def __len__(self):
+        """Number of items."""
+        return len(self.items)
+
+    def __iter__(self):
+        """Iterate over the items."""
+        return iter(self.items)
+
+    def __enter__(self):
+        """Context manager entry: return the pool."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Context manager exit: stop the workers."""
+        self.close()
+
+    def search(self, query, match_on, fold_diacritics, min_score=0,
+               max_results=0, ascending=False):
+        """Filter the items in the workers (see :meth:`Workflow.filter`).
+
+        :returns: list of ``(sort key, (item, score, rule))`` tuples, i.e.
+            the ``max_results`` best results of every shard (all of them
+            if ``max_results`` is 0)
+        :rtype: ``list``
+
+        """
+        request = (query, match_on, fold_diacritics, min_score, max_results,
+                   ascending)
+        with self._lock:
+            for _, connection, _ in self._workers:
+                connection.send(request)
+            replies = [connection.recv() for _, connection, _ in self._workers]
+
+        results = []
+        for (_, _, start), reply in zip(self._workers, replies):
+            if isinstance(reply, Exception):
+                raise reply
+            results.extend([(k, (self.items[start + n], score, rule))
+                            for k, (n, score, rule) in reply])
+
+        return results
+
+    def close(self):
+        """Stop the workers."""
+        with self._lock:
+            for process, connection, _ in self._workers:
+                try:
+                    connection.send(None)
+                except (IOError, OSError):  # worker already gone
+                    pass
+                connection.close()
+                process.join()
+            self._workers = []
+
+
 class Settings(dict):
     """A dictionary that saves itself when changed.
 
@@ -966,6 +1331,8 @@ class Workflow(object):
         self._last_version_run = UNSET
         # Cache for regex patterns created for filter keys
         self._search_pattern_cache = {}
+        # Candidates of the last incremental filter
+        self._filter_candidates = None
         #: Prefix for all magic arguments.
         #: The default value is ``workflow:`` so keyword
         #: ``config`` would match user query ``workflow:config``.
@@ -1764,7 +2131,7 @@ class Workflow(object):
 
     def filter(self, query, items, key=lambda x: x, ascending=False,
                include_score=False, min_score=0, max_results=0,
-               match_on=MATCH_ALL, fold_diacritics=True):
+               match_on=MATCH_ALL, fold_diacritics=True, incremental=False):
         """Fuzzy search filter. Returns list of ``items`` that match ``query``.
 
         ``query`` is case-insensitive. Any item that does not contain the
@@ -1775,8 +2142,10 @@ class Workflow(object):
 
         :param query: query to test items against
         :type query: ``unicode``
-        :param items: iterable of items to test
-        :type items: ``list`` or ``tuple``
+        :param items: iterable of items to test, or a :class:`FilterIndex`
+            or :class:`FilterPool` of them (whose own ``key`` is then used)
+        :type items: ``list``, ``tuple``, :class:`FilterIndex` or
+            :class:`FilterPool`
         :param key: function to get comparison key from ``items``.
             Must return a ``unicode`` string. The default simply returns
             the item.
@@ -1798,6 +2167,10 @@ class Workflow(object):
         :param fold_diacritics: Convert search keys to ASCII-only
             characters if ``query`` only contains ASCII characters.
         :type fold_diacritics: ``Boolean``
+        :param incremental: Remember the items that may match ``query``
+            and only test those when the next query extends it. Only
+            used if ``items`` is a :class:`FilterIndex`.
+        :type incremental: ``Boolean``
         :returns: list of ``items`` matching ``query`` or list of
             ``(item, score, rule)`` `tuples` if ``include_score`` is ``True``.
             ``rule`` is the ``MATCH_*`` rule that matched the item.
@@ -1862,20 +2235,100 @@ class Workflow(object):
         If ``query`` contains non-ASCII characters, search keys will not be
         altered.
 
+        **Search index**
+
+        .. note::
+
+            Search indexes, incremental filtering and parallel filtering
+            are local additions to the copy of Alfred-Workflow 1.39.0
+            vendored with dmus, i.e. not part of any Alfred-Workflow
+            release.
+
+        When filtering the same (large) collection again and again, e.g.
+        on every keystroke, pass a :class:`FilterIndex` of it as ``items``:
+        the search keys are then only computed (lower-cased, folded, split
+        into atoms, etc.) when the index is built. For large collections,
+        the index also runs :const:`MATCH_ALLCHARS` for all the items left
+        unmatched by the other rules at once (see ``batch`` in
+        :class:`FilterIndex`), with the same scores.
+
+        **Incremental filtering**
+
+        Alfred runs a Script Filter on every keystroke, each query usually
+        being the previous one plus one character. An item that lacks
+        some characters of a query cannot match any query extending it,
+        so with ``incremental=True`` (and a :class:`FilterIndex` as
+        ``items``), :meth:`filter` saves the items containing all the
+        characters of ``query`` and the next call only tests those if its
+        query extends this one (e.g. ``kal`` after ``ka``, or ``ka l``
+        after ``ka``). Results and scores are the same as without it.
+
+        :class:`Workflow` keeps these candidates in memory, which suits
+        long-running processes. :class:`~workflow.Workflow3` saves them
+        in the session cache (see :meth:`~workflow.Workflow3.cache_data`),
+        so that they are also available to the next run of the Script
+        Filter.
+
+        **Parallel filtering**
+
+        To filter a very large collection with several CPUs, e.g. from a
+        long-running process, pass a :class:`FilterPool` of it as
+        ``items``: the collection is then split across worker processes,
+        which filter their part of it at the same time.
+
         """
+        index = items if isinstance(items, (FilterIndex, FilterPool)) else None
+
         if not query:
-            return items
+            return index.items if index is not None else items
 
         # Remove preceding/trailing spaces
         query = query.strip()
 
         if not query:
-            return items
+            return index.items if index is not None else items
 
         # Use user override if there is one
         fold_diacritics = self.settings.get('__workflow_diacritic_folding',
                                             fold_diacritics)
 
+        if isinstance(items, FilterPool):
+            results = items.search(query, match_on, fold_diacritics,
+                                   min_score, max_results, ascending)
+        elif index is not None:
+            results = self._filter_index(index, query, match_on,
+                                         fold_diacritics, incremental,
+                                         min_score)
+        else:
+            results = self._filter_items(items, key, query, match_on,
+                                         fold_diacritics, min_score)
+
+        # sort on keys, then discard the keys. Only the ``max_results``
+        # best results are needed: select them with a heap instead of
+        # sorting all the matches (same order as ``sort()``)
+        if max_results and len(results) > max_results:
+            if ascending:
+                results = heapq.nlargest(max_results, results)
+            else:
+                results = heapq.nsmallest(max_results, results)
+        else:
+            results.sort(reverse=ascending)
+        results = [t[1] for t in results]
+
+        # return list of ``(item, score, rule)``
+        if include_score:
+            return results
+        # just return list of items
+        return [t[0] for t in results]
+
+    def _filter_items(self, items, key, query, match_on, fold_diacritics,
+                      min_score=0):
+        """Match ``items`` against ``query`` (see :meth:`filter`).
+
+        :returns: list of ``(sort key, (item, score, rule))`` tuples
+            (only those scoring more than ``min_score``, if non-zero)
+
+        """
         results = []
 
         for item in items:
@@ -1898,6 +2351,9 @@ class Workflow(object):
             if skip:
                 continue
 
+            if min_score and score <= min_score:
+                continue
+
             if score:
                 # use "reversed" `score` (i.e. highest becomes lowest) and
                 # `value` as sort key. This means items with the same score
@@ -1905,21 +2361,179 @@ class Workflow(object):
                 results.append(((100.0 / score, value.lower(), score),
                                 (item, score, rule)))
 
-        # sort on keys, then discard the keys
-        results.sort(reverse=ascending)
-        results = [t[1] for t in results]
+        return results
 
-        if min_score:
-            results = [r for r in results if r[1] > min_score]
+    def _filter_index(self, index, query, match_on, fold_diacritics,
+                      incremental=False, min_score=0):
+        """Match the items of ``index`` against ``query`` (see :meth:`filter`).
 
-        if max_results and len(results) > max_results:
-            results = results[:max_results]
+        :returns: list of ``(sort key, (item, score, rule))`` tuples
+            (only those scoring more than ``min_score``, if non-zero)
 
-        # return list of ``(item, score, rule)``
-        if include_score:
-            return results
-        # just return list of items
-        return [t[0] for t in results]
+        """
+        results = []
+
+        # lower-cased words of the query, along with their characters
+        # and the search keys (folded or not) to test them against
+        words = []
+        words_left = len([w for w in query.split(' ') if w.strip()])
+        for word in query.split(' '):
+            word = word.strip().lower()
+            if word == '':
+                continue
+            folded = fold_diacritics and isascii(word)
+            if folded:
+                keys = index.folded_keys(self.fold_to_ascii)
+            else:
+                keys = index.keys
+            # number of words after this one
+            words_left -= 1
+            words.append((word, frozenset(word), keys, folded, words_left))
+
+        # with a batched index, the items left unmatched by the other
+        # rules are tested with `MATCH_ALLCHARS` all at once, at the end
+        batch = index.batch and match_on & MATCH_ALLCHARS
+        if batch:
+            match_on ^= MATCH_ALLCHARS
+        # ``(position, score, rule, scores)`` of these items, ``score``
+        # adding up the words before the first one left to test, and
+        # ``scores`` being the ``(word, score)`` of the following words
+        # (``None`` for the words left to test)
+        pending = []
+
+        # positions of the items to test: all of them, or only the
+        # candidates of the previous query if this one extends it
+        positions = None
+        if incremental:
+            previous = self._load_filter_candidates()
+            if (previous and previous.get('index') == index.fingerprint and
+                    self._filter_query_extends(previous['words'], words)):
+                positions = previous['candidates']
+        if positions is None:
+            positions = xrange(len(index.keys))
+
+        candidates = []
+        items = index.items
+        for i in positions:
+            value = index.keys[i]
+            if value is None:
+                continue
+            # pre-filter any items that do not contain all characters
+            # of every word (same test as `_match_key`, without the call)
+            for word, chars, keys, _, _ in words:
+                if not chars <= keys[i].chars:
+                    break
+            else:
+                candidates.append(i)
+                score = 0
+                scores = ()
+                for n, (word, _, keys, _, words_left) in enumerate(words):
+                    s, rule = self._match_key(keys[i], word, match_on)
+                    if batch and rule is None:
+                        scores += ((n, None),)
+                        continue
+                    if not s:  # Skip items that don't match part of the query
+                        break
+                    if scores:  # (keep adding the scores in the same order)
+                        scores += ((n, s),)
+                        continue
+                    score += s
+                    # Skip items that can no longer score above `min_score`
+                    # (a word scores 100 at most)
+                    if min_score:
+                        max_score = score
+                        for _ in xrange(words_left):
+                            max_score += 100.0
+                        if max_score <= min_score:
+                            break
+                else:
+                    if scores:
+                        pending.append((i, score, rule, scores))
+                    elif score:
+                        results.append(((100.0 / score, value.lower, score),
+                                        (items[i], score, rule)))
+
+        if pending:
+            # `MATCH_ALLCHARS` scores of the pending items, word by word
+            allchars = []
+            for n, (word, _, keys, _, _) in enumerate(words):
+                allchars.append(index.allchars_scores(
+                    keys, word, [p[0] for p in pending if (n, None) in p[3]]))
+
+            for i, score, rule, scores in pending:
+                for n, s in scores:
+                    if s is None:
+                        s = allchars[n].get(i)
+                        if not s:  # Skip items that don't match the word
+                            break
+                    score += s
+                else:
+                    if min_score and score <= min_score:
+                        continue
+                    if rule is None:  # the last word is a deferred one
+                        rule = MATCH_ALLCHARS
+                    if score:
+                        value = index.keys[i]
+                        results.append(((100.0 / score, value.lower, score),
+                                        (items[i], score, rule)))
+
+        if incremental:
+            self._save_filter_candidates({
+                'index': index.fingerprint,
+                'words': [(w[0], w[3]) for w in words],
+                'candidates': candidates,
+            })
+
+        return results
+
+    def _filter_query_extends(self, previous_words, words):
+        """Whether query ``words`` narrow down ``previous_words``.
+
+        True if every item matching ``words`` contains all the characters
+        of ``previous_words``, i.e. if each previous word has a counterpart
+        at the same position in ``words`` that contains all its characters
+        and is tested against the same (folded or not) search keys, e.g.
+        when ``words`` were typed after ``previous_words``.
+
+        :param previous_words: ``(word, folded)`` tuples of the previous
+            query
+        :type previous_words: ``list``
+        :param words: ``(word, chars, keys, folded, words_left)`` tuples
+            of the query
+        :type words: ``list``
+        :rtype: ``Boolean``
+
+        """
+        if len(previous_words) > len(words):
+            return False
+
+        for (previous_word, previous_folded), word in zip(previous_words,
+                                                          words):
+            chars, folded = word[1], word[3]
+            if previous_folded != folded or not set(previous_word) <= chars:
+                return False
+
+        return True
+
+    def _load_filter_candidates(self):
+        """Candidates saved by the last incremental :meth:`filter`.
+
+        :returns: ``dict`` saved by :meth:`_save_filter_candidates` or
+            ``None``
+
+        """
+        return self._filter_candidates
+
+    def _save_filter_candidates(self, candidates):
+        """Save the candidates of an incremental :meth:`filter`.
+
+        :param candidates: fingerprint of the :class:`FilterIndex`, words
+            of the query and positions of the items containing all their
+            characters
+        :type candidates: ``dict``
+
+        """
+        self._filter_candidates = candidates
 
     def _filter_item(self, value, query, match_on, fold_diacritics):
         """Filter ``value`` against ``query`` using rules ``match_on``.
@@ -1935,14 +2549,28 @@ class Workflow(object):
         if fold_diacritics:
             value = self.fold_to_ascii(value)
 
+        return self._match_key(_FilterKey(value), query, match_on)
+
+    def _match_key(self, key, query, match_on):
+        """Match search key ``key`` against ``query`` using rules ``match_on``.
+
+        :param key: search key of the item
+        :type key: :class:`_FilterKey`
+        :param query: lower-cased query word
+        :type query: ``unicode``
+        :returns: ``(score, rule)``
+
+        """
+        value = key.value
+
         # pre-filter any items that do not contain all characters
         # of ``query`` to save on running several more expensive tests
-        if not set(query) <= set(value.lower()):
+        if not set(query) <= key.chars:
 
             return (0, None)
 
         # item starts with query
-        if match_on & MATCH_STARTSWITH and value.lower().startswith(query):
+        if match_on & MATCH_STARTSWITH and key.lower.startswith(query):
             score = 100.0 - (len(value) / len(query))
 
             return (score, MATCH_STARTSWITH)
@@ -1950,27 +2578,17 @@ class Workflow(object):
         # query matches capitalised letters in item,
         # e.g. of = OmniFocus
         if match_on & MATCH_CAPITALS:
-            initials = ''.join([c for c in value if c in INITIALS])
-            if initials.lower().startswith(query):
+            initials = key.capitals
+            if initials.startswith(query):
                 score = 100.0 - (len(initials) / len(query))
 
                 return (score, MATCH_CAPITALS)
 
-        # split the item into "atoms", i.e. words separated by
-        # spaces or other non-word characters
-        if (match_on & MATCH_ATOM or
-                match_on & MATCH_INITIALS_CONTAIN or
-                match_on & MATCH_INITIALS_STARTSWITH):
-            atoms = [s.lower() for s in split_on_delimiters(value)]
-            # print('atoms : %s  -->  %s' % (value, atoms))
-            # initials of the atoms
-            initials = ''.join([s[0] for s in atoms if s])
-
         if match_on & MATCH_ATOM:
             # is `query` one of the atoms in item?
             # similar to substring, but scores more highly, as it's
             # a word within the item
-            if query in atoms:
+            if query in key.atoms:
                 score = 100.0 - (len(value) / len(query))
 
                 return (score, MATCH_ATOM)
@@ -1980,21 +2598,21 @@ class Workflow(object):
         # *and* "how i met your mother" (the ``capitals`` rule only
         # matches the former)
         if (match_on & MATCH_INITIALS_STARTSWITH and
-                initials.startswith(query)):
-            score = 100.0 - (len(initials) / len(query))
+                key.initials.startswith(query)):
+            score = 100.0 - (len(key.initials) / len(query))
 
             return (score, MATCH_INITIALS_STARTSWITH)
 
         # `query` is a substring of initials, e.g. ``doh`` matches
         # "The Dukes of Hazzard"
         elif (match_on & MATCH_INITIALS_CONTAIN and
-                query in initials):
-            score = 95.0 - (len(initials) / len(query))
+                query in key.initials):
+            score = 95.0 - (len(key.initials) / len(query))
 
             return (score, MATCH_INITIALS_CONTAIN)
 
         # `query` is a substring of item
-        if match_on & MATCH_SUBSTRING and query in value.lower():
+        if match_on & MATCH_SUBSTRING and query in key.lower:
             score = 90.0 - (len(value) / len(query))
 
             return (score, MATCH_SUBSTRING)
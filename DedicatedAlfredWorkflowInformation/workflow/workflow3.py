@@ -648,6 +648,24 @@ class Workflow3(Workflow):
 
         return super(Workflow3, self).cached_data(name, data_func, max_age)
 
+    def _load_filter_candidates(self):
+        """Candidates saved by the last incremental filter of the session.
+
+        See :meth:`~workflow.Workflow.filter`.
+
+        """
+        return self.cached_data('__workflow_filter_candidates', max_age=0,
+                                session=True)
+
+    def _save_filter_candidates(self, candidates):
+        """Save the candidates of an incremental filter to the session cache.
+
+        See :meth:`~workflow.Workflow.filter`.
+
+        """
+        self.cache_data('__workflow_filter_candidates', candidates,
+                        session=True)
+
     def clear_session_cache(self, current=False):
         """Remove session data from the cache.
 
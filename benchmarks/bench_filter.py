@@ -0,0 +1,168 @@
+#!/usr/local/bin/python2.7
+# coding: utf-8
+
+
+# bench_filter.py
+# Benchmark of Workflow.filter, the fuzzy search of the Alfred-Workflow library (cf.: DedicatedAlfredWorkflowInformation/workflow) run by Alfred script filters on every keystroke, over a large synthetic collection of downloaded track titles
+# (Every case filters the same collection with the same query and options, and their results are checked to be identical)
+# (The "full sort" case sorts all the matches before keeping the best ones, the way Workflow.filter did before selecting them with a heap)
+# (The "batched" case runs MATCH_ALLCHARS for all the items left unmatched by the other rules at once, cf.: FilterIndex.allchars_scores)
+# (The "incremental" case saves its candidates in the session cache of Workflow3, the way successive runs of a script filter within the same Alfred session do: every repetition of a keystroke starts from the candidates saved by the previous keystroke)
+# (The "FilterPool" case splits the collection across worker processes, cf.: --processes)
+
+
+## Required packages
+import os
+import sys
+import time
+import random
+import tempfile
+import multiprocessing
+from argparse import ArgumentParser
+
+
+## Configurations
+
+# Path of the directory containing the "workflow" package
+WORKFLOW_LIBRARY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'DedicatedAlfredWorkflowInformation')
+
+# Alfred environment variables (the "workflow" package expects to run within Alfred)
+alfred_environment = {
+    'alfred_version': '4.0',
+    'alfred_workflow_bundleid': 'net.dmus.bench-filter',
+    'alfred_workflow_name': 'bench-filter',
+    'alfred_workflow_uid': 'user.workflow.bench-filter',
+    'alfred_workflow_data': os.path.join(tempfile.gettempdir(), 'dmus-bench-filter', 'data'),
+    'alfred_workflow_cache': os.path.join(tempfile.gettempdir(), 'dmus-bench-filter', 'cache'),
+}
+
+# Queries, typed one character at a time the way Alfred runs the script filter on every keystroke
+queries = ['kalo', 'bd', 'track 07', u'mø lyr']
+
+# Syllables of the synthetic track titles (a few of them with diacritics, so that the ASCII folding is exercised)
+syllables = ['ka', 'lo', 'mi', 'ne', 'ra', 'so', 'tu', 'vi', 'xe', 'zo', 'Bre', 'Dan', 'Fo', 'Gil', 'Ham', u'Mø', u'Jé', u'Strå']
+
+
+## Functions
+
+def generate_titles(count, seed=0):
+    """
+    Generates synthetic track titles, e.g. "Dankalo Mø - Soravi (Lyrics) - track07"
+
+    Args:
+        count (int): The number of titles
+        seed (int): The seed of the random generator (the same seed always gives the same titles)
+
+    Returns:
+        titles (list): List containing the titles
+    """
+
+    rng = random.Random(seed)
+    titles = []
+    for _ in range(count):
+        words = [''.join(rng.choice(syllables) for _ in range(rng.randint(1, 3))) for _ in range(rng.randint(2, 6))]
+        suffix = rng.choice(['', ' (Lyrics)', ' (Official Video)', ' [Live]'])
+        titles.append(u'{0} - {1}{2} - track{3:02d}'.format(words[0], ' '.join(words[1:]), suffix, rng.randint(1, 20)))
+
+    return titles
+
+
+def keystrokes(query):
+    """
+    Returns the successive queries typed to get to a query (e.g. "ka" --> ["k", "ka"])
+    """
+
+    return [query[:length] for length in range(1, len(query) + 1)]
+
+
+def time_case(operation, query, repetitions, setup=None):
+    """
+    Times the filtering of one query by a benchmark case
+
+    Args:
+        operation (function): The benchmark case (called with the query)
+        query (unicode): The query
+        repetitions (int): The number of repetitions
+        setup (function): Function called before every repetition, outside of the timing (e.g. restoring the state left by the previous query)
+
+    Returns:
+        duration (float): The best duration [s] of the repetitions
+        results (list): The results of the last repetition
+    """
+
+    timer = getattr(time, 'perf_counter', time.time)
+    durations = []
+    for _ in range(repetitions):
+        if setup is not None:
+            setup()
+        start = timer()
+        results = operation(query)
+        durations.append(timer() - start)
+
+    return min(durations), results
+
+
+## Main process
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Benchmark of Workflow.filter over a large synthetic collection of track titles')
+    parser.add_argument('--items', metavar='N', type=int, default=100000, help='number of items of the collection (default: 100000)')
+    parser.add_argument('--max-results', metavar='N', type=int, default=20, help='"max_results" of every filter (default: 20)')
+    parser.add_argument('--min-score', metavar='SCORE', type=float, default=0, help='"min_score" of every filter (default: 0)')
+    parser.add_argument('--processes', metavar='N', type=int, default=multiprocessing.cpu_count(), help='number of worker processes of the FilterPool (default: number of CPUs)')
+    parser.add_argument('--repetitions', metavar='N', type=int, default=3, help='number of repetitions of every query (default: 3)')
+    args = parser.parse_args()
+
+    for name, value in alfred_environment.items():
+        os.environ.setdefault(name, value)
+    sys.path.insert(0, WORKFLOW_LIBRARY_PATH)
+    from workflow import FilterIndex, FilterPool, Workflow, Workflow3
+
+    wf = Workflow()
+    wf3 = Workflow3()
+    items = generate_titles(args.items)
+    timer = getattr(time, 'perf_counter', time.time)
+    start = timer()
+    index = FilterIndex(items, batch=False)
+    print('FilterIndex of {0} items built in {1:.0f}[ms]'.format(len(items), 1000 * (timer() - start)))
+    batched_index = FilterIndex(items, batch=True)
+    start = timer()
+    pool = FilterPool(items, processes=args.processes)
+    wf.filter(queries[0], pool)  # (waits for the workers to index their items)
+    print('FilterPool of {0} processes ready in {1:.0f}[ms]'.format(args.processes, 1000 * (timer() - start)))
+
+    # Candidates saved by the "incremental" case for the previous keystroke (restored before every repetition, so that no repetition narrows down the candidates saved by the previous repetition of the same keystroke)
+    previous_candidates = None
+
+    # Benchmark cases (the first one being the reference), with the function called before every repetition
+    cases = [
+        ('items', lambda query: wf.filter(query, items, include_score=True, min_score=args.min_score, max_results=args.max_results), None),
+        ('full sort', lambda query: wf.filter(query, index, include_score=True, min_score=args.min_score)[:args.max_results or None], None),
+        ('FilterIndex', lambda query: wf.filter(query, index, include_score=True, min_score=args.min_score, max_results=args.max_results), None),
+        ('incremental', lambda query: wf3.filter(query, index, include_score=True, min_score=args.min_score, max_results=args.max_results, incremental=True), lambda: wf3._save_filter_candidates(previous_candidates)),
+        ('batched', lambda query: wf.filter(query, batched_index, include_score=True, min_score=args.min_score, max_results=args.max_results), None),
+        ('FilterPool', lambda query: wf.filter(query, pool, include_score=True, min_score=args.min_score, max_results=args.max_results), None),
+    ]
+
+    totals = [0.0] * len(cases)
+    print('\n{0:<12}'.format('query') + ''.join('{0:>18}'.format(name + ' [ms]') for name, _, _ in cases))
+    for query in queries:
+        previous_candidates = None # (every query is typed from scratch)
+        for typed_query in keystrokes(query):
+            durations = []
+            reference = None
+            for position, (name, operation, setup) in enumerate(cases):
+                duration, results = time_case(operation, typed_query, args.repetitions, setup)
+                if reference is None:
+                    reference = results
+                elif results != reference:
+                    raise RuntimeError('"{0}" and "{1}" give different results for "{2}"'.format(name, cases[0][0], typed_query))
+                durations.append(duration)
+                totals[position] += duration
+            previous_candidates = wf3._load_filter_candidates()
+            print(u'{0:<12}'.format(typed_query).encode('utf-8') + ''.join('{0:>18.1f}'.format(1000 * duration) for duration in durations))
+
+    wf3.clear_session_cache(current=True)
+    pool.close()
+
+    print('{0:<12}'.format('total') + ''.join('{0:>18.1f}'.format(1000 * total) for total in totals))
+    print('{0:<12}'.format('speedup') + ''.join('{0:>18}'.format('x{0:.1f}'.format(totals[0] / total)) for total in totals))
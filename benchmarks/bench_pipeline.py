@@ -0,0 +1,274 @@
+#!/usr/local/bin/python2.7
+# coding: utf-8
+
+
+# bench_pipeline.py
+# Offline benchmark of the "dmus.py" pipeline: measures the latency and throughput of audio_downloader, extract_audio, add_metadata and of the full flow (process_video) on synthetic video fixtures
+# (The fixtures (various durations and audio codecs, plus multi-video posts) are generated locally with ffmpeg and served by a local HTTP server standing in for the video platforms: a single video is a direct link handled by the youtube_dl "generic" extractor, and a multi-video post is an RSS feed whose items are the videos of the post)
+
+
+## Required packages
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import tempfile
+import threading
+import subprocess
+from argparse import ArgumentParser
+try:
+    from http.server import HTTPServer, SimpleHTTPRequestHandler
+except ImportError:
+    from BaseHTTPServer import HTTPServer
+    from SimpleHTTPServer import SimpleHTTPRequestHandler
+
+
+## Configurations
+
+# Path of the "dmus.py" script
+DMUS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dmus.py')
+
+# Container and ffmpeg encoding options of each fixture audio codec ("extractable" codecs are in ".mp4" containers and can therefore also be given to extract_audio)
+fixture_codecs = {
+    'aac': {'extension': '.mp4', 'options': ['-c:v', 'libx264', '-preset', 'ultrafast', '-c:a', 'aac', '-b:a', '128k'], 'extractable': True},
+    'mp3': {'extension': '.mp4', 'options': ['-c:v', 'libx264', '-preset', 'ultrafast', '-c:a', 'libmp3lame', '-b:a', '128k'], 'extractable': True},
+    'opu': {'extension': '.webm', 'options': ['-c:v', 'libvpx', '-deadline', 'realtime', '-cpu-used', '8', '-c:a', 'libopus', '-b:a', '96k'], 'extractable': False},
+    'vor': {'extension': '.webm', 'options': ['-c:v', 'libvpx', '-deadline', 'realtime', '-cpu-used', '8', '-c:a', 'libvorbis', '-q:a', '4'], 'extractable': False},
+}
+
+# Null stream receiving the prints of the benchmarked functions
+devnull = io.open(os.devnull, 'w', encoding='utf-8') if sys.version_info[0] >= 3 else open(os.devnull, 'w')
+
+
+## Functions
+
+def load_dmus(download_directory, data_directory):
+    """
+    Imports "dmus.py" as a module, with its DOWNLOAD_DIRECTORY pointing to the benchmark output directory
+
+    Args:
+        download_directory (str): The absolute path of the directory receiving the ".mp3" audio files
+        data_directory (str): The absolute path of the directory receiving the dmus indexes (download cache and audio fingerprints)
+
+    Returns:
+        dmus (module): The imported "dmus.py" module
+    """
+
+    sys.path.insert(0, os.path.dirname(DMUS_PATH))
+    import dmus
+
+    dmus.DOWNLOAD_DIRECTORY = download_directory
+    dmus.NOTIFICATION_BACKEND = 'none'
+    dmus.TIMINGS_LOG_PATH = ''
+    # Keeping the indexes away from the user's ones
+    dmus.DMUS_DATA_DIRECTORY = data_directory
+    dmus.DOWNLOAD_CACHE_PATH = os.path.join(data_directory, 'download_cache.json')
+    dmus.AUDIO_FINGERPRINTS_PATH = os.path.join(data_directory, 'audio_fingerprints.json')
+    dmus.PARTIAL_DOWNLOADS_PATH = os.path.join(data_directory, 'partial_downloads.json')
+    # Stubbing the URL validation, which (rightly) rejects the local HTTP server address
+    dmus.is_url = lambda clipboard_value: clipboard_value.startswith('http://127.0.0.1:')
+    # Silencing the Finder comments, which are out of the scope of the benchmark (they require macOS and the Finder)
+    dmus.write_finder_comments = False
+
+    return dmus
+
+
+def generate_fixture(fixtures_directory, codec, duration, index=0):
+    """
+    Generates (once) a synthetic video file with ffmpeg: a small black video stream and a sine wave audio stream encoded with the given codec
+
+    Args:
+        fixtures_directory (str): The absolute path of the directory receiving the fixtures
+        codec (str): The key of the audio codec in fixture_codecs
+        duration (int): The duration of the video in seconds
+        index (int): The index of the video (different indexes give different audio streams)
+
+    Returns:
+        fixture_path (str): The absolute path of the video file (whose name is, like a YouTube video id, 11 characters long, cf.: the renaming in process_video)
+    """
+
+    fixture_path = os.path.join(fixtures_directory, '{0}-{1:03d}s-{2:02d}{3}'.format(codec, duration, index, fixture_codecs[codec]['extension']))
+    if not os.path.isfile(fixture_path):
+        subprocess.check_call([os.environ.get('FFMPEG_BINARY', 'ffmpeg'), '-y', '-loglevel', 'error',
+                               '-f', 'lavfi', '-i', 'color=c=black:s=160x120:r=5:d={0}'.format(duration),
+                               '-f', 'lavfi', '-i', 'sine=frequency={0}:duration={1}'.format(220 + 20 * index, duration)]
+                              + fixture_codecs[codec]['options'] + ['-shortest', fixture_path])
+
+    return fixture_path
+
+
+def generate_post(fixtures_directory, base_url, fixture_path_list, post_name):
+    """
+    Writes the RSS feed of a multi-video post (one item per video)
+
+    Returns:
+        post_path (str): The absolute path of the RSS feed
+    """
+
+    items = ''.join('<item><title>{0}</title><enclosure url="{1}/{2}" type="video/mp4"/></item>'.format(
+        os.path.splitext(os.path.basename(fixture_path))[0], base_url, os.path.basename(fixture_path)) for fixture_path in fixture_path_list)
+    post_path = os.path.join(fixtures_directory, post_name + '.rss')
+    with io.open(post_path, 'w', encoding='utf-8') as f:
+        f.write(u'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>{0}</title>{1}</channel></rss>'.format(post_name, items))
+
+    return post_path
+
+
+def serve_directory(directory):
+    """
+    Serves the content of a directory with a local HTTP server running in a background thread
+
+    Args:
+        directory (str): The absolute path of the directory to serve
+
+    Returns:
+        server (HTTPServer): The running HTTP server (listening on 127.0.0.1, on a free port)
+    """
+
+    class QuietHandler(SimpleHTTPRequestHandler):
+        def translate_path(self, path):
+            return os.path.join(directory, path.lstrip('/').split('?')[0])
+
+        def log_message(self, format, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), QuietHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    return server
+
+
+def reset_output(dmus, output_directory):
+    """
+    Empties the output directory and the dmus indexes, so that every repetition starts cold (no cache hit, no hard-linked duplicate)
+    """
+
+    for file_name in os.listdir(output_directory):
+        os.remove(os.path.join(output_directory, file_name))
+    for index_path in [dmus.DOWNLOAD_CACHE_PATH, dmus.AUDIO_FINGERPRINTS_PATH]:
+        if os.path.isfile(index_path):
+            os.remove(index_path)
+
+
+def measure(name, operation, input_bytes, repetitions, setup=None):
+    """
+    Times an operation over several repetitions, the optional setup running (untimed) before each of them
+
+    Args:
+        name (str): The name of the benchmark case
+        operation (function): The operation to time (called without argument)
+        input_bytes (int): The number of bytes processed by the operation (used to compute the throughput)
+        repetitions (int): The number of repetitions
+        setup (function): The function to call before each repetition
+
+    Returns:
+        result (dict): The name, number of repetitions, mean/median/min/max latencies [s] and throughput [MB/s] of the case
+    """
+
+    timer = getattr(time, 'perf_counter', time.time)
+    durations = []
+    for _ in range(repetitions):
+        if setup is not None:
+            setup()
+        start = timer()
+        operation()
+        durations.append(timer() - start)
+
+    durations.sort()
+    mean = sum(durations) / len(durations)
+
+    return {
+        'name': name,
+        'repetitions': repetitions,
+        'mean': mean,
+        'median': durations[len(durations) // 2],
+        'min': durations[0],
+        'max': durations[-1],
+        'throughput': input_bytes / mean / 1e6 if mean else 0.0,
+    }
+
+
+def silenced(function, *arguments):
+    """
+    Returns a function calling the given function with the given arguments while discarding what it prints
+    (The null stream is never closed: the youtube_dl engines keep writing to the stdout they were created with)
+    """
+
+    def run():
+        stdout = sys.stdout
+        sys.stdout = devnull
+        try:
+            return function(*arguments)
+        finally:
+            sys.stdout = stdout
+
+    return run
+
+
+## Main process
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Offline benchmark of audio_downloader, extract_audio, add_metadata and of the full flow of "dmus.py" on synthetic video fixtures')
+    parser.add_argument('--durations', metavar='SECONDS', type=int, nargs='+', default=[10, 60, 300], help='durations of the fixture videos (default: 10 60 300)')
+    parser.add_argument('--codecs', metavar='CODEC', nargs='+', choices=sorted(fixture_codecs), default=sorted(fixture_codecs), help='audio codecs of the fixture videos (default: all)')
+    parser.add_argument('--post-size', metavar='N', type=int, default=3, help='number of videos of the multi-video post (default: 3)')
+    parser.add_argument('--repetitions', metavar='N', type=int, default=3, help='number of repetitions of every case (default: 3)')
+    parser.add_argument('--fixtures-dir', metavar='/my/fixtures', type=str, default=os.path.join(tempfile.gettempdir(), 'dmus-bench-fixtures'), help='directory in which the fixtures are generated and kept between runs')
+    parser.add_argument('--json', metavar='/my/results.json', type=str, default=None, help='also writes the results to a JSON file (e.g. to compare two versions of "dmus.py")')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.fixtures_dir):
+        os.makedirs(args.fixtures_dir)
+    output_directory = tempfile.mkdtemp(prefix='dmus-bench-output-')
+    data_directory = tempfile.mkdtemp(prefix='dmus-bench-data-')
+    server = serve_directory(args.fixtures_dir)
+    base_url = 'http://127.0.0.1:{0}'.format(server.server_address[1])
+    try:
+        print('Generating the fixtures in {0}...'.format(args.fixtures_dir))
+        fixture_path_list = [generate_fixture(args.fixtures_dir, codec, duration) for codec in args.codecs for duration in args.durations]
+        post_path_list = [generate_fixture(args.fixtures_dir, args.codecs[0], args.durations[0], index) for index in range(args.post_size)]
+        post_path = generate_post(args.fixtures_dir, base_url, post_path_list, 'post-{0}x{1}-{2:03d}s'.format(args.post_size, args.codecs[0], args.durations[0]))
+
+        dmus = load_dmus(output_directory, data_directory)
+        reset = lambda: reset_output(dmus, output_directory)
+        silenced(dmus.get_youtube_dl_engine, dmus.AUDIO_PROFILE)() # creating the youtube_dl engine of the main thread beforehand, like the dmus daemon does (its creation would otherwise be timed by the first case)
+
+        results = []
+        for fixture_path in fixture_path_list + [post_path]:
+            fixture_name = os.path.basename(fixture_path)
+            url = '{0}/{1}'.format(base_url, fixture_name)
+            if fixture_path == post_path:
+                input_bytes = sum(os.path.getsize(path) for path in post_path_list)
+            else:
+                input_bytes = os.path.getsize(fixture_path)
+            print('Benchmarking {0}...'.format(fixture_name))
+
+            results.append(measure('audio_downloader ' + fixture_name, silenced(dmus.audio_downloader, url), input_bytes, args.repetitions, reset))
+            results.append(measure('process_video    ' + fixture_name, silenced(dmus.process_video, url), input_bytes, args.repetitions, reset))
+            results.append(measure('process_video (cached) ' + fixture_name, silenced(dmus.process_video, url), input_bytes, args.repetitions))
+
+            _, audio_file_path_list = silenced(dmus.audio_downloader, url)()
+            results.append(measure('add_metadata     ' + fixture_name, silenced(dmus.add_metadata, url, audio_file_path_list), sum(os.path.getsize(path) for path in audio_file_path_list), args.repetitions))
+
+            if fixture_path != post_path and fixture_codecs[fixture_name[:3]]['extractable']:
+                video_file_path = os.path.join(output_directory, fixture_name)
+                def copy_video(video_file_path=video_file_path, fixture_path=fixture_path):
+                    reset()
+                    shutil.copy(fixture_path, video_file_path)
+                results.append(measure('extract_audio    ' + fixture_name, silenced(dmus.extract_audio, video_file_path), input_bytes, args.repetitions, copy_video))
+
+        print('\n{0:<48} {1:>11} {2:>11} {3:>11} {4:>11} {5:>10}'.format('case', 'mean [ms]', 'median [ms]', 'min [ms]', 'max [ms]', 'MB/s'))
+        for result in results:
+            print('{0:<48} {1:>11.1f} {2:>11.1f} {3:>11.1f} {4:>11.1f} {5:>10.2f}'.format(
+                result['name'], 1000 * result['mean'], 1000 * result['median'], 1000 * result['min'], 1000 * result['max'], result['throughput']))
+
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+    finally:
+        server.shutdown()
+        shutil.rmtree(output_directory)
+        shutil.rmtree(data_directory)
@@ -0,0 +1,83 @@
+#!/usr/local/bin/python2.7
+# coding: utf-8
+
+
+# bench_profiles.py
+# Benchmark of the output profiles of "dmus.py": CPU seconds spent by ffmpeg to produce the audio file of each profile out of synthetic videos of each audio codec (cf.: bench_pipeline.py for the fixtures), along with the size of the produced audio files
+
+
+## Required packages
+import os
+import sys
+import shutil
+import tempfile
+import resource
+from argparse import ArgumentParser
+from bench_pipeline import load_dmus, generate_fixture, fixture_codecs
+
+
+## Functions
+
+def children_cpu_time():
+    """
+    Returns the CPU time (user + system) in seconds consumed so far by the terminated child processes of the current process (i.e. the ffmpeg commands)
+    """
+
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    return usage.ru_utime + usage.ru_stime
+
+
+def bench_profile(dmus, profile_name, video_file_path, output_directory, repetitions):
+    """
+    Produces the audio file of an output profile out of a video file with ffmpeg (the way extract_audio does) several times
+
+    Returns:
+        cpu_time (float): The mean CPU time in seconds of one extraction
+        extension (str): The extension of the produced audio file
+        size (int): The size in bytes of the produced audio file
+    """
+
+    audio_codec = dmus.probe_audio_codec(video_file_path)
+    extension, codec_options = dmus.get_audio_encoding(profile_name, audio_codec)
+    audio_file_path = os.path.join(output_directory, profile_name + extension)
+
+    start = children_cpu_time()
+    for _ in range(repetitions):
+        if dmus.ffmpeg_extract_audio(video_file_path, audio_file_path, codec_options) != 0:
+            raise RuntimeError('ffmpeg failed to produce "{0}" out of "{1}"'.format(audio_file_path, video_file_path))
+    cpu_time = (children_cpu_time() - start) / repetitions
+
+    return cpu_time, extension, os.path.getsize(audio_file_path)
+
+
+## Main process
+if __name__ == '__main__':
+    parser = ArgumentParser(description='CPU seconds per output profile of "dmus.py" (audio extraction with ffmpeg)')
+    parser.add_argument('--duration', metavar='SECONDS', type=int, default=300, help='duration of the fixture videos (default: 300)')
+    parser.add_argument('--codecs', metavar='CODEC', nargs='+', choices=sorted(fixture_codecs), default=sorted(fixture_codecs), help='audio codecs of the fixture videos (default: all)')
+    parser.add_argument('--repetitions', metavar='N', type=int, default=3, help='number of extractions per profile and codec (default: 3)')
+    parser.add_argument('--fixtures-dir', metavar='/my/fixtures', type=str, default=os.path.join(tempfile.gettempdir(), 'dmus-bench-fixtures'), help='directory in which the fixtures are generated and kept between runs')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.fixtures_dir):
+        os.makedirs(args.fixtures_dir)
+    output_directory = tempfile.mkdtemp(prefix='dmus-bench-output-')
+    data_directory = tempfile.mkdtemp(prefix='dmus-bench-data-')
+    try:
+        print('Generating the fixtures in {0}...'.format(args.fixtures_dir))
+        fixture_path_list = [generate_fixture(args.fixtures_dir, codec, args.duration) for codec in args.codecs]
+        dmus = load_dmus(output_directory, data_directory)
+
+        print('\nCPU seconds per {0}[s] video (and audio file size in kB), {1} repetition(s)'.format(args.duration, args.repetitions))
+        print('{0:<10}'.format('profile') + ''.join('{0:>24}'.format('from ' + codec) for codec in args.codecs))
+        for profile_name in sorted(dmus.audio_profiles):
+            cells = []
+            for fixture_path in fixture_path_list:
+                cpu_time, extension, size = bench_profile(dmus, profile_name, fixture_path, output_directory, args.repetitions)
+                cells.append('{0:>8.3f} {1:<6} {2:>7.0f}kB'.format(cpu_time, extension, size / 1e3))
+            print('{0:<10}'.format(profile_name) + ''.join('{0:>24}'.format(cell) for cell in cells))
+            sys.stdout.flush()
+    finally:
+        shutil.rmtree(output_directory)
+        shutil.rmtree(data_directory)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+
+# bench_startup.py
+# Startup-time report of "dmus.py" based on "python -X importtime" (Python >= 3.7), also acting as a regression check: it fails in case one of the heavy packages, which must only be imported by the branch needing them, is imported at startup
+
+
+## Required packages
+import os
+import re
+import sys
+import subprocess
+from argparse import ArgumentParser
+
+
+## Configurations
+
+# Path of the "dmus.py" script
+DMUS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dmus.py')
+
+# Packages that must NOT be imported when "dmus.py" starts
+LAZY_PACKAGES = ['pandas', 'moviepy', 'youtube_dl', 'applescript', 'validator_collection', 'osascript', 'playsound', 'numpy', 'imageio']
+
+
+## Functions
+
+def measure_import_times(arguments):
+    """
+    Runs "dmus.py" with "python -X importtime" and parses the import times it reports
+
+    Args:
+        arguments (list): The command line arguments passed to "dmus.py"
+
+    Returns:
+        import_times (list): List containing one (module name, self time [us], cumulative time [us]) tuple per imported module
+
+    Raises:
+        RuntimeError: In case "dmus.py" failed (e.g. a package imported at startup is missing), its import times being then incomplete
+    """
+
+    process = subprocess.Popen([sys.executable, '-X', 'importtime', DMUS_PATH] + arguments, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    _, stderr = process.communicate()
+    if process.returncode != 0:
+        error_lines = [line for line in stderr.decode('utf-8', 'replace').splitlines() if not line.startswith('import time:')]
+        raise RuntimeError('"dmus.py" exited with code {0}:\n{1}'.format(process.returncode, '\n'.join(error_lines[-10:])))
+
+    import_times = []
+    for line in stderr.decode('utf-8', 'replace').splitlines():
+        match = re.match(r'import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)', line)
+        if match:
+            import_times.append((match.group(4), int(match.group(1)), int(match.group(2))))
+
+    return import_times
+
+
+## Main process
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Startup-time report and lazy-import regression check of "dmus.py"')
+    parser.add_argument('--top', metavar='N', type=int, default=15, help='number of slowest imports to display (default: 15)')
+    args = parser.parse_args()
+
+    try:
+        import_times = measure_import_times(['--help'])
+    except RuntimeError as e:
+        print('❌ ERROR! {0}'.format(e))
+        sys.exit(1)
+    total_time = sum(self_time for _, self_time, _ in import_times)
+
+    print('{0:<40} {1:>12} {2:>16}'.format('module', 'self [ms]', 'cumulative [ms]'))
+    for module, self_time, cumulative_time in sorted(import_times, key=lambda import_time: import_time[2], reverse=True)[:args.top]:
+        print('{0:<40} {1:>12.1f} {2:>16.1f}'.format(module, self_time / 1000.0, cumulative_time / 1000.0))
+    print('{0} modules imported in {1:.1f}[ms]'.format(len(import_times), total_time / 1000.0))
+
+    eagerly_imported = sorted(set(module.split('.')[0] for module, _, _ in import_times) & set(LAZY_PACKAGES))
+    if eagerly_imported:
+        print('❌ ERROR! Heavy package(s) imported at startup: {0}'.format(', '.join(eagerly_imported)))
+        sys.exit(1)
+    print('✅ No heavy package imported at startup')
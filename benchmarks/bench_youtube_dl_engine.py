@@ -0,0 +1,132 @@
+#!/usr/local/bin/python2.7
+# coding: utf-8
+
+
+# bench_youtube_dl_engine.py
+# Benchmark of the per-URL overhead of youtube_dl when it is spawned as a "youtube-dl" command for every URL (former "dmus.py" behavior) versus when one in-process youtube_dl.YoutubeDL engine is reused for all the URLs (current "dmus.py" behavior)
+# (The videos are served by a local HTTP server so that the benchmark runs offline and measures the youtube_dl overhead rather than the network)
+
+
+## Required packages
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import subprocess
+import youtube_dl # (pip install youtube_dl)
+from argparse import ArgumentParser
+try:
+    from http.server import HTTPServer, SimpleHTTPRequestHandler
+except ImportError:
+    from BaseHTTPServer import HTTPServer
+    from SimpleHTTPServer import SimpleHTTPRequestHandler
+
+
+## Functions
+
+def serve_directory(directory):
+    """
+    Serves the content of a directory with a local HTTP server running in a background thread
+
+    Args:
+        directory (str): The absolute path of the directory to serve
+
+    Returns:
+        server (HTTPServer): The running HTTP server (listening on 127.0.0.1, on a free port)
+    """
+
+    class QuietHandler(SimpleHTTPRequestHandler):
+        def translate_path(self, path):
+            return os.path.join(directory, path.lstrip('/').split('?')[0])
+
+        def log_message(self, format, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), QuietHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    return server
+
+
+def create_media_files(directory, number_of_files, size):
+    """
+    Writes dummy ".mp3" files to download (their content is never decoded since no postprocessing is done during the benchmark)
+
+    Args:
+        directory (str): The absolute path of the directory in which to write the files
+        number_of_files (int): The number of files to write
+        size (int): The size of each file in bytes
+
+    Returns:
+        file_name_list (list): List containing the names of the written files
+    """
+
+    file_name_list = []
+    for i in range(number_of_files):
+        file_name = 'clip-{0}.mp3'.format(i)
+        with open(os.path.join(directory, file_name), 'wb') as f:
+            f.write(os.urandom(size))
+        file_name_list.append(file_name)
+
+    return file_name_list
+
+
+def bench_command(url_list, output_directory):
+    """
+    Downloads every URL by spawning one "youtube-dl" command per URL
+
+    Returns:
+        elapsed (float): The total wall-clock time in seconds
+    """
+
+    start = time.time()
+    for url in url_list:
+        subprocess.check_call([sys.executable, '-m', 'youtube_dl', '--quiet', '--output', os.path.join(output_directory, 'command-%(title)s.%(ext)s'), url])
+
+    return time.time() - start
+
+
+def bench_engine(url_list, output_directory):
+    """
+    Downloads every URL with one single youtube_dl.YoutubeDL engine reused for all the URLs (the import time of youtube_dl is paid once per process and is therefore not included)
+
+    Returns:
+        elapsed (float): The total wall-clock time in seconds
+    """
+
+    start = time.time()
+    ydl = youtube_dl.YoutubeDL({'quiet': True, 'outtmpl': os.path.join(output_directory, 'engine-%(title)s.%(ext)s')})
+    for url in url_list:
+        ydl.download([url])
+
+    return time.time() - start
+
+
+## Main process
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Benchmark of the per-URL overhead of youtube_dl (command per URL vs reused in-process engine)')
+    parser.add_argument('--urls', metavar='N', type=int, default=10, help='number of URLs to download (default: 10)')
+    parser.add_argument('--size', metavar='BYTES', type=int, default=256 * 1024, help='size of each served file in bytes (default: 262144)')
+    args = parser.parse_args()
+
+    served_directory = tempfile.mkdtemp(prefix='dmus-bench-served-')
+    output_directory = tempfile.mkdtemp(prefix='dmus-bench-output-')
+    server = serve_directory(served_directory)
+    try:
+        file_name_list = create_media_files(served_directory, args.urls, args.size)
+        url_list = ['http://127.0.0.1:{0}/{1}'.format(server.server_address[1], file_name) for file_name in file_name_list]
+
+        elapsed_command = bench_command(url_list, output_directory)
+        elapsed_engine = bench_engine(url_list, output_directory)
+
+        print('{0:<32} {1:>12} {2:>16}'.format('mode', 'total [s]', 'per URL [ms]'))
+        print('{0:<32} {1:>12.3f} {2:>16.1f}'.format('youtube-dl command per URL', elapsed_command, 1000 * elapsed_command / len(url_list)))
+        print('{0:<32} {1:>12.3f} {2:>16.1f}'.format('reused youtube_dl engine', elapsed_engine, 1000 * elapsed_engine / len(url_list)))
+    finally:
+        server.shutdown()
+        shutil.rmtree(served_directory)
+        shutil.rmtree(output_directory)
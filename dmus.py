@@ -19,18 +19,37 @@ os.chdir(project_path) # setting the current working directory based on the path
 
 
 ## Required packages
-import glob
+import io
+import sys
+import json
+import time
+import uuid
+import errno
+import fcntl
+import random
+import sqlite3
+import hashlib
+import socket
 import os.path
+import re
 import platform
-import osascript
-import applescript # (pip install applescript)
-import moviepy.editor # for extracting ".mp3" audio file from ".mp4" video file
-from pathlib import Path # for eventually getting the parent directory of the video file from which to extract the audio
+import contextlib
+import tempfile
+import shutil
+import subprocess
+import threading
 from termcolor import colored # (pip install termcolor)
-from playsound import playsound # for playing the notification sound
-from argparse import ArgumentParser
-from validator_collection import checkers # to validate URLs (pip install validator-collection)
-from pandas.io.clipboard import clipboard_get # to access the string situated in the clipboard
+from argparse import ArgumentParser, Namespace
+from multiprocessing.pool import ThreadPool # for processing several videos concurrently in batch mode
+try:
+    from socketserver import ThreadingMixIn, UnixStreamServer, StreamRequestHandler
+except ImportError:
+    from SocketServer import ThreadingMixIn, UnixStreamServer, StreamRequestHandler
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+# (The heavy packages, i.e. youtube_dl, moviepy, applescript, validator_collection, osascript and playsound, are only imported by the functions needing them, so that the program starts quickly whatever the branch it takes)
 
 
 ## Configurations
@@ -38,70 +57,282 @@ from pandas.io.clipboard import clipboard_get # to access the string situated in
 # Setting the DOWNLOAD_DIRECTORY
 DOWNLOAD_DIRECTORY = '/Users/anthony/Downloads' # name of the folder in which we will put the downloaded audio file(s) (this can be adjusted by the user)
 
-# Moving to the "Downloads" directory
-os.chdir(DOWNLOAD_DIRECTORY)
+# Directory in which every job gets its own workspace, i.e. the temporary directory receiving its intermediate files (downloads, ".part" files, audio extraction) until its audio file(s) are moved to their destination (None for the system temporary directory, cf.: "--workspace-dir", e.g. a tmpfs such as "/dev/shm")
+# (No job ever changes the current working directory, so that several jobs can run concurrently in the same process)
+WORKSPACE_DIRECTORY = None
+
+# Name of the lock file of every workspace (locked by the job using the workspace, cf.: JobWorkspace)
+WORKSPACE_LOCK_FILE_NAME = '.dmus-job.lock'
 
 # Sound paths
 sound_path_start = '/System/Library/Sounds/Blow.aiff'
 sound_path_success = '/System/Library/Sounds/Hero.aiff'
 sound_path_fail = '/System/Library/Sounds/Sosumi.aiff'
 
+# Notification backend ("auto", "terminal-notifier", "notify-send", "log" or "none", cf.: "--notifier")
+NOTIFICATION_BACKEND = 'auto'
+
+# Notifications being posted in background threads
+pending_notifications = []
+
+# ffmpeg binary used by moviepy, also used directly for the audio-only extraction (resolved on first use by get_ffmpeg_binary)
+FFMPEG_BINARY = None
+
+# Output profiles of the audio files (cf.: "--profile"), i.e. "preferredcodec" and "preferredquality" of the youtube_dl audio extraction (a quality below 10 being a VBR level and otherwise a bitrate in kbit/s) and, optionally, the youtube_dl download format
+# ("original" copies the audio stream of the video as is whenever its codec fits an audio file (AAC into ".m4a", MP3, Opus, Vorbis into ".ogg" and FLAC), the other audio streams being transcoded into MP3, and "fastest" also prefers the download formats whose audio stream can be copied, cf.: benchmarks/bench_profiles.py)
+audio_profiles = {
+    'original': {'codec': 'best', 'quality': '2'},
+    'fastest': {'codec': 'best', 'quality': '5', 'format': 'bestaudio[acodec^=mp4a]/bestaudio[acodec=opus]/bestaudio[acodec=vorbis]/bestaudio[acodec=mp3]/bestaudio/best'},
+    'opus': {'codec': 'opus', 'quality': '128'},
+    'aac': {'codec': 'm4a', 'quality': '192'},
+    'mp3-v0': {'codec': 'mp3', 'quality': '0'},
+    'mp3-v2': {'codec': 'mp3', 'quality': '2'},
+    'mp3-v5': {'codec': 'mp3', 'quality': '5'},
+}
+
+# Output profile of the audio files (the ".mp3" files of "mp3-v5" are those of the "youtube-dl --extract-audio --audio-format mp3" command)
+AUDIO_PROFILE = 'mp3-v5'
+
+# Default options of convert, i.e. of the conversion of one video URL or video file path (cf.: convert)
+convert_options = {
+    'profile': None, # output profile of the audio file(s) (None for AUDIO_PROFILE)
+    'force': False, # downloading the video again even if the download cache holds its audio file(s)
+    'output_directory': None, # directory receiving the audio file(s) of a video URL (None for DOWNLOAD_DIRECTORY, the audio file of a video file path being written next to it)
+}
+
+# ffmpeg encoder of each audio file format
+audio_encoders = {
+    '.mp3': 'libmp3lame',
+    '.m4a': 'aac',
+    '.opus': 'libopus',
+    '.ogg': 'libvorbis',
+    '.flac': 'flac',
+}
+
+# youtube_dl options (the audio extraction postprocessor is added according to the output profile, cf.: get_youtube_dl_engine)
+ydl_opts = {
+    'format': 'bestaudio/best',
+    'outtmpl': '%(title)s-%(id)s.%(ext)s', # (relative to the directory the audio file(s) are downloaded into, cf.: audio_downloader)
+    'continuedl': True, # resuming the interrupted downloads from their ".part" file with HTTP range requests...
+    'nopart': False, # ...which requires downloading into ".part" files (renamed once complete)
+}
+
+# Boolean value to also write the URL in the Finder "Comments" of the ".mp3" file(s) on macOS (it is always written in their ID3 "Comments" frame)
+write_finder_comments = True
+
+# Path of the Unix domain socket on which the dmus daemon listens (cf.: "dmus.py --serve")
+SOCKET_PATH = os.path.join(tempfile.gettempdir(), 'dmus-{0}.sock'.format(os.getuid()))
+
+# Time [s] to wait for the dmus daemon to accept a connection, and then for its results, per submitted video argument (the video argument(s) being processed within the current process once it elapses, cf.: submit_to_daemon)
+daemon_connect_timeout = 5
+daemon_response_timeout = 900
+
+# Directory in which dmus keeps its state (e.g. the download cache and audio fingerprint indexes)
+DMUS_DATA_DIRECTORY = os.path.expanduser('~/.dmus')
+
+# Path of the download cache index (normalized video URL --> downloaded ".mp3" audio file(s))
+DOWNLOAD_CACHE_PATH = os.path.join(DMUS_DATA_DIRECTORY, 'download_cache.json')
+
+# Path of the audio fingerprint index (fingerprint of the source audio stream --> extracted ".mp3" audio file)
+AUDIO_FINGERPRINTS_PATH = os.path.join(DMUS_DATA_DIRECTORY, 'audio_fingerprints.json')
+
+# Path of the partial download index (normalized video URL --> ".part" file(s) being downloaded and bytes received so far)
+PARTIAL_DOWNLOADS_PATH = os.path.join(DMUS_DATA_DIRECTORY, 'partial_downloads.json')
+
+# Number of bytes received between two checkpoints of a ".part" file in the partial download index
+checkpoint_interval = 4 * 1024 * 1024
+
+# Path of the job queue (SQLite database recording every video argument to process and the state of its job, so that a stopped batch can be resumed and several dmus processes can share the work, cf.: "--resume")
+JOB_QUEUE_PATH = os.path.join(DMUS_DATA_DIRECTORY, 'jobs.sqlite')
+
+# States of the jobs of the job queue (a job goes from "queued" to "done" or "failed", through the active states)
+active_job_states = ['downloading', 'extracting', 'tagging']
+finished_job_states = ['done', 'failed']
+
+# Number of seconds during which the finished jobs are kept in the job queue
+job_retention = 30 * 24 * 3600
 
-## Parsing the input argument
-if not debugModeOn:
-    parser = ArgumentParser(description='"dmus.py" is a Python program that\
-        allows to retrieve the ".mp3" audio file from either a video URL or a video file path.\
-        The software currently supports videos hosted on at least following platforms: \
-        YouTube, Instagram. In case a video doesn\'t come from one of the above-mentioned \
-        websites, the program might not work and the ".mp3" audio file might not be retrieved.')
-    parser.add_argument('--vid', metavar='/my/video/url/or/file/path', type=str, default='clipboard', help='extract the ".mp3" audio content of the video url or video file path')
-    args = parser.parse_args()
-    argsVid = args.vid
-else: # in case we are in "debug mode"
-    argsVid = 'video information required'
-
-
-## Tests (hard-coded clipboard_value examples)
-if argsVid == 'video information required':
-    #--- FILE PATH
-    # ✅ Absolute file path of existing video:
-    #argsVid = project_path + '/tests/test-vid.mp4'
-    # ✅ Absolute file path of nonexistent video:
-    #argsVid = project_path + '/tests/tada.mp4'
-    #--- YOUTUBE
-    # ✅ URL of YouTube video resulting in a ".mp4" file if downloaded using the below youtube-dl options
-    #argsVid = 'https://www.youtube.com/watch?v=1vnnFYTZGRI'
-    # ✅ URL of YouTube video
-    #argsVid = 'https://www.youtube.com/watch?v=UIrGxHhdqXo'
-    # ✅ URL of YouTube video
-    #argsVid = 'https://www.youtube.com/watch?v=A_H8t0OqyQ0'
-    # ✅ URL of YouTube video presenting encoding problem for writing metadata ("UnicodeDecodeError: 'ascii' codec can't decode byte 0xc3 in position 26: ordinal not in range(128)")
-    # (YouTube video called "MØ - When I Was Young (Lyrics _ Lyric Video)")
-    argsVid = 'https://www.youtube.com/watch?v=FVGXaglgCVk'
-    # ✅ URL of YouTube video that is NO MORE available
-    #argsVid = 'https://youtu.be/UjrlC9mGCD'
-    #--- INSTAGRAM
-    # ✅ URL of Instagram post containing SEVERAL Instagram videos:
-    #argsVid = 'https://www.instagram.com/p/B_-gogqAtuU/?igshid=1pjsrn7we7kdu'
-    # ✅ URL of Instagram post containing ONE single Instagram video:
-    #argsVid = 'https://www.instagram.com/p/B_3hd-kDVpq/?igshid=r8fbjeekqiv7'
-    # ✅ URL of Instagram post containing only ".jpg" files (the program then returns no error but works fine, no video is downloaded and nothing bad happens):
-    #argsVid = 'https://www.instagram.com/p/BxCvRcalCsi/'
-    # ✅ URL of Instagram post that is NO MORE available
-    #argsVid = 'https://instagram.com/p/B-VHAIzpd57/'
+# Storage of the identifier of the job of the job queue processed by each thread
+job_queue_context = threading.local()
+
+# Lock protecting the indexes against concurrent updates from the threads of the current process
+index_lock = threading.Lock()
+
+# Path of the JSON lines log receiving the timing of every stage of every job (cf.: "--timings-log", an empty path disabling it)
+TIMINGS_LOG_PATH = os.path.join(DMUS_DATA_DIRECTORY, 'timings.jsonl')
+
+# Lock serializing the writes of the timing records of the threads of the current process
+timings_log_lock = threading.Lock()
+
+# Storage of the job (identifier and video argument) processed by each thread, attached to the timing records
+timing_context = threading.local()
+
+# Most precise clock available to measure durations
+timer = getattr(time, 'perf_counter', time.time)
+
+# Number of times a download failing for a transient reason (network failure, rate limiting, server error) is retried, and delays in seconds before the first retry and between any two retries (the delay doubles at every retry) (cf.: "--retries")
+DOWNLOAD_RETRIES = 3
+retry_base_delay = 2
+retry_max_delay = 60
+
+# HTTP status codes and socket errors denoting a transient failure (any other HTTP error, e.g. "404 Not Found", denotes an unavailable video)
+transient_http_status_codes = [408, 425, 429, 500, 502, 503, 504]
+transient_socket_errnos = [errno.ECONNRESET, errno.ECONNREFUSED, errno.ECONNABORTED, errno.ETIMEDOUT, errno.EPIPE, errno.ENETUNREACH, errno.EHOSTUNREACH, errno.ENETDOWN]
+
+# Maximum number of downloads running at the same time against each host ("default" applying to every host not listed), so that batch runs do not trip the rate limits of the video platforms
+host_concurrency_limits = {
+    'youtube.com': 2,
+    'instagram.com': 1,
+    'default': 3,
+}
+
+# Other domain names of the hosts listed above
+host_aliases = {
+    'youtu.be': 'youtube.com',
+    'youtube-nocookie.com': 'youtube.com',
+    'instagr.am': 'instagram.com',
+}
+
+# Semaphores enforcing the host_concurrency_limits (created on first use by host_slot) and lock protecting their creation
+host_semaphores = {}
+host_semaphores_lock = threading.Lock()
+
+# Storage of the youtube_dl engines of each thread (one youtube_dl.YoutubeDL instance is created per thread and output profile and then reused for all the URLs processed by this thread with this profile)
+youtube_dl_engines = threading.local()
 
 
 ## Functions
 
-def audio_downloader(url):
+class DownloadedFileRecorder(object):
+    """
+    youtube_dl postprocessor recording the absolute path of every final file (i.e. after the audio extraction) produced by a youtube_dl engine
+    (It implements the interface of youtube_dl.postprocessor.common.PostProcessor without inheriting from it, so that youtube_dl is only imported when a URL is downloaded)
+    """
+
+    def __init__(self, downloader=None):
+        self._downloader = downloader
+        self.file_path_list = []
+        self.fingerprint_list = []
+
+    def set_downloader(self, downloader):
+        self._downloader = downloader
+
+    def run(self, information):
+        file_path = os.path.abspath(information['filepath'])
+        if file_path not in self.file_path_list:
+            self.file_path_list.append(file_path)
+            self.fingerprint_list.append(information.get('dmus_audio_fingerprint'))
+        return [], information
+
+
+class DownloadCheckpointer(object):
+    """
+    youtube_dl progress hook checkpointing the ".part" file(s) of the URL being downloaded by a youtube_dl engine in the partial download index, so that an interrupted download (network failure, closed iTerm2 window, etc.) is resumed by the next run instead of starting from zero
+    """
+
+    def __init__(self):
+        self.url = None
+        self.normalized_url = None
+        self.checkpointed_bytes = {}
+
+    def start(self, url, part_file_list):
+        self.url = url
+        self.normalized_url = normalize_url(url)
+        self.checkpointed_bytes = dict((part_file['path'], part_file['size']) for part_file in part_file_list)
+
+    def __call__(self, d):
+        if self.url is None:
+            return
+        if d['status'] == 'downloading' and d.get('tmpfilename'):
+            part_file_path = os.path.abspath(d['tmpfilename'])
+            downloaded_bytes = d.get('downloaded_bytes') or 0
+            if downloaded_bytes - self.checkpointed_bytes.get(part_file_path, 0) >= checkpoint_interval:
+                store_partial_download(self.normalized_url, self.url, part_file_path, downloaded_bytes, d.get('total_bytes') or d.get('total_bytes_estimate'))
+                self.checkpointed_bytes[part_file_path] = downloaded_bytes
+        elif d['status'] == 'finished':
+            part_file_path = os.path.abspath(d.get('tmpfilename') or d['filename'] + '.part') # (cf.: FileDownloader.temp_name in https://github.com/ytdl-org/youtube-dl/blob/master/youtube_dl/downloader/common.py)
+            if part_file_path in self.checkpointed_bytes:
+                clear_partial_download(self.normalized_url, part_file_path)
+                del self.checkpointed_bytes[part_file_path]
+
+
+class DuplicateAudioLinker(object):
+    """
+    youtube_dl postprocessor run before the audio extraction: in case the downloaded audio stream was already extracted with the same output profile (whatever the URL it came from), it copies the existing audio file in place of the one to extract, so that the audio extraction postprocessor has nothing left to transcode
+    (The audio file is copied rather than hard-linked since the URL of the video is then written in its tags, which would otherwise overwrite the URL written in the tags of the existing audio file)
+    (Same duck-typed PostProcessor interface as DownloadedFileRecorder)
+    """
+
+    def __init__(self, profile_name, downloader=None):
+        self.profile_name = profile_name
+        self._downloader = downloader
+
+    def set_downloader(self, downloader):
+        self._downloader = downloader
+
+    def run(self, information):
+        set_current_job_state('extracting')
+        path = information['filepath']
+        fingerprint = information['dmus_audio_fingerprint'] = profiled_fingerprint(audio_fingerprint(path), self.profile_name)
+        existing_audio_file_path = lookup_audio_fingerprint(fingerprint) if fingerprint else None
+        if existing_audio_file_path is None:
+            return [], information
+        audio_file_path = path.rpartition('.')[0] + os.path.splitext(existing_audio_file_path)[1] # path of the audio file which the audio extraction postprocessor would write (the same audio stream and profile always give the same audio file format)
+        if audio_file_path == path or link_duplicate_audio(fingerprint, audio_file_path, copy=True) is None:
+            return [], information
+
+        print(' ♻️  Audio stream already extracted, "{0}" copied instead of transcoded'.format(audio_file_path.encode('utf-8')))
+        information['filepath'] = audio_file_path # the audio extraction postprocessor then skips this audio file
+        information['ext'] = audio_file_path.rpartition('.')[2]
+        return [path], information
+
+
+def get_youtube_dl_engine(profile_name):
+    """
+    Returns the long-lived youtube_dl engine of the current thread for an output profile (creating it on first use)
+
+    Args:
+        profile_name (str): The name of the output profile (cf.: audio_profiles)
+
+    Returns:
+        ydl (youtube_dl.YoutubeDL): The youtube_dl engine (its extractors stay instantiated between the URLs)
+        recorder (DownloadedFileRecorder): The postprocessor recording the file(s) produced by the engine
+        checkpointer (DownloadCheckpointer): The progress hook checkpointing the ".part" file(s) downloaded by the engine
     """
-    Uses the youtube_dl Python package to download the ".mp3" audio file(s) from a URL
+
+    if not hasattr(youtube_dl_engines, 'engines'):
+        youtube_dl_engines.engines = {}
+
+    if profile_name not in youtube_dl_engines.engines:
+        import youtube_dl # (pip install youtube_dl)
+        from youtube_dl.postprocessor import get_postprocessor
+        profile = audio_profiles[profile_name]
+        ydl = youtube_dl.YoutubeDL(dict(ydl_opts, format=profile.get('format', ydl_opts['format'])))
+        ydl.add_post_processor(DuplicateAudioLinker(profile_name)) # run before the audio extraction postprocessor
+        ydl.add_post_processor(get_postprocessor('FFmpegExtractAudio')(ydl, preferredcodec=profile['codec'], preferredquality=profile['quality'], nopostoverwrites=False))
+        recorder = DownloadedFileRecorder()
+        ydl.add_post_processor(recorder) # run after the audio extraction postprocessor
+        checkpointer = DownloadCheckpointer()
+        ydl.add_progress_hook(checkpointer)
+        youtube_dl_engines.engines[profile_name] = (ydl, recorder, checkpointer)
+
+    return youtube_dl_engines.engines[profile_name]
+
+
+def audio_downloader(url, profile_name=None, download_directory=None, checkpoint=True):
+    """
+    Uses the youtube_dl Python package to download the ".mp3" audio file(s) from a URL, within the concurrency limit of its host (cf.: host_slot)
+    The download slot of the host is only held while downloading: the postprocessors (fingerprint of the audio stream, audio extraction) run once it is released
 
     Args:
         url (str): The URL of the video
+        profile_name (str): The name of the output profile of the audio file(s) (default: AUDIO_PROFILE)
+        download_directory (str): The directory in which the audio file(s) are downloaded, e.g. the workspace of the job (default: DOWNLOAD_DIRECTORY)
+        checkpoint (bool): Boolean value to checkpoint the ".part" file(s) in the partial download index (cf.: DownloadCheckpointer), i.e. unless the download directory is removed whatever happens
 
     Returns:
-        audio_paths_list (list): List containing the absolute file path(s) of the downloaded audio file(s)
+        returned_value (int): The youtube_dl return code ("0" in case the download succeeded)
+        audio_file_path_list (list): List containing the absolute file path(s) of the downloaded audio file(s)
     """
 
     # Trying to dynamically upgrade youtube_dl (cf.: "How do I update a Python package?" (https://stackoverflow.com/questions/5183672/how-do-i-update-a-python-package))
@@ -111,238 +342,1826 @@ def audio_downloader(url):
     #returned_value_upgrade_ytdl = os.system('pip install youtube_dl --upgrade')
     #---
 
-    # Getting the number of ".mp3" files preliminarily (i.e. before downloading the ".mp3" audio file(s)) situated in the DOWNLOAD_DIRECTORY
-    number_mp3_DOWNLOAD_DIRECTORY_before_download = len(glob.glob1(DOWNLOAD_DIRECTORY, "*.mp3"))
+    ydl, recorder, checkpointer = get_youtube_dl_engine(profile_name or AUDIO_PROFILE)
+    download_directory = os.path.abspath(download_directory or DOWNLOAD_DIRECTORY)
+    ydl.params['outtmpl'] = os.path.join(download_directory, ydl_opts['outtmpl']) # (the engine belonging to the current thread, its output template can be changed from one URL to the next)
+
+    # Announcing the download(s) of the current post that an interrupted run left unfinished (youtube_dl resumes them from their ".part" file, as long as it is in the download directory)
+    part_file_list = [part_file for part_file in lookup_partial_downloads(url) if os.path.dirname(part_file['path']) == download_directory]
+    for part_file in part_file_list:
+        print(' ⏯️  Resuming "{0}" from byte {1} (out of {2})'.format(part_file['path'].encode('utf-8'), part_file['size'], part_file['total_bytes'] or '?'))
+
+    # Getting (all) the new ".mp3" audio file(s) of the current post from the recorder postprocessor
+    recorder.file_path_list = []
+    recorder.fingerprint_list = []
+    if checkpoint:
+        checkpointer.start(url, part_file_list)
+    deferred_post_processing = []
+    ydl.post_process = lambda file_path, information: deferred_post_processing.append((file_path, information)) # (shadowing YoutubeDL.post_process, called by YoutubeDL.process_info once a file is downloaded)
+    try:
+        with host_slot(url):
+            returned_value = ydl.download([url])
+    finally:
+        del ydl.post_process
+        checkpointer.url = None
+
+    # Running the postprocessors on the downloaded file(s) (the same way as YoutubeDL.process_info, cf.: https://github.com/ytdl-org/youtube-dl/blob/master/youtube_dl/YoutubeDL.py)
+    from youtube_dl.utils import PostProcessingError
+    for file_path, information in deferred_post_processing:
+        try:
+            ydl.post_process(file_path, information)
+        except PostProcessingError as e:
+            ydl.report_error('postprocessing: {0}'.format(e)) # (raises DownloadError, unless the "ignoreerrors" option is set)
+            returned_value = 1
+            continue
+        ydl.record_download_archive(information)
+    print("youtube_dl returned_value: ", returned_value) # prints "0" (this means that the download run successfully)
+    audio_file_path_list = recorder.file_path_list
+
+    # Recording the fingerprint of the audio stream of the new ".mp3" audio file(s)
+    for audio_file_path, fingerprint in zip(audio_file_path_list, recorder.fingerprint_list):
+        if fingerprint:
+            store_audio_fingerprint(fingerprint, audio_file_path)
+    print(' audio_file_path_list: {0}'.format(audio_file_path_list))
 
-    command = 'youtube-dl --extract-audio --audio-format mp3 ' + url
-    returned_value = os.system(command)
-    print("youtube_dl returned_value: ", returned_value) # prints "0" (this means that the command run successfully)
+    return returned_value, audio_file_path_list
 
-    # Getting the number of ".mp3" files situated in the DOWNLOAD_DIRECTORY after downloading the ".mp3" audio file(s)
-    number_mp3_DOWNLOAD_DIRECTORY_after_download = len(glob.glob1(DOWNLOAD_DIRECTORY, "*.mp3"))
 
-    # Getting the number of downloaded ".mp3" audio file(s)
-    number_of_downloaded_audios = number_mp3_DOWNLOAD_DIRECTORY_after_download - number_mp3_DOWNLOAD_DIRECTORY_before_download
+def download_with_retries(url, profile_name=None, download_directory=None, checkpoint=True):
+    """
+    Downloads the ".mp3" audio file(s) from a URL with audio_downloader, retrying the transient failures with exponential backoff (the interrupted downloads being resumed from their ".part" file)
 
-    # Getting (all) the new ".mp3" audio file(s) of the current post
-    audio_files = glob.glob(DOWNLOAD_DIRECTORY + "/*.mp3")
-    audio_files.sort(key=os.path.getctime, reverse=True)
-    new_audio_files = audio_files[0:number_of_downloaded_audios]
-    audio_file_path_list = []
-    for i in range(number_of_downloaded_audios):
-        audio_file_path = new_audio_files[i]
-        audio_file_path_list.append(audio_file_path)
-    print(' audio_file_path_list: {0}'.format(audio_file_path_list))
+    Args:
+        url (str): The URL of the video
+        profile_name (str): The name of the output profile of the audio file(s) (default: AUDIO_PROFILE)
+        download_directory (str): The directory in which the audio file(s) are downloaded, e.g. the workspace of the job (default: DOWNLOAD_DIRECTORY)
+        checkpoint (bool): Boolean value to checkpoint the ".part" file(s) in the partial download index (cf.: audio_downloader)
 
-    return returned_value, audio_file_path_list
+    Returns:
+        returned_value (int): The youtube_dl return code ("0" in case the download succeeded)
+        audio_file_path_list (list): List containing the absolute file path(s) of the downloaded audio file(s)
+        attempts (int): The number of download attempts
+
+    Raises:
+        Exception: The error of the last attempt, in case it is not transient or there is no retry left (cf.: classify_download_failure)
+    """
 
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            returned_value, audio_file_path_list = audio_downloader(url, profile_name, download_directory, checkpoint)
+            return returned_value, audio_file_path_list, attempts
+        except Exception as e:
+            if attempts > DOWNLOAD_RETRIES or classify_download_failure(e) != 'transient':
+                raise
+            delay = min(retry_max_delay, retry_base_delay * 2 ** (attempts - 1))
+            delay *= random.uniform(0.5, 1) # (jitter, so that the videos failing together are not retried together)
+            print(colored('Warning!', 'yellow'), 'Download of {0} failed for a transient reason ({1}), retrying in {2:.1f}[s] ({3}/{4})...'.format(to_native(url), to_native(error_message(e)), delay, attempts, DOWNLOAD_RETRIES))
+            time.sleep(delay)
 
-def extract_audio(video_file_path):
+
+def classify_download_failure(error):
     """
-    Extracts ".mp3" audio file from a ".mp4" video file
-    Cf.: https://www.codespeedy.com/extract-audio-from-video-using-python/
+    Classifies the error raised by a download, walking down the chain of its causes (youtube_dl wraps the network errors into ExtractorError and DownloadError)
 
     Args:
-        video_file_path (str): Video absolute file path
+        error (Exception): The error raised by audio_downloader
 
     Returns:
-        no_error (int): Number equal to "1" in case there is no error and "0" in case the conversion failed
+        failure (str): "transient" (network failure, rate limiting or server error: worth retrying), "unavailable" (removed, private, geo-blocked or unsupported video: not worth retrying) or "error" (any other error)
     """
 
-    no_error = 1
+    from youtube_dl.utils import ContentTooShortError, ExtractorError, UnavailableVideoError, UnsupportedError, compat_HTTPError, compat_urllib_error, compat_http_client
+
+    failure = 'error'
+    causes = []
+    cause = error
+    while cause is not None and cause not in causes:
+        causes.append(cause)
+        if isinstance(cause, compat_HTTPError):
+            return 'transient' if cause.code in transient_http_status_codes else 'unavailable'
+        if isinstance(cause, (ContentTooShortError, compat_http_client.IncompleteRead, socket.timeout)) \
+                or isinstance(cause, compat_urllib_error.URLError) \
+                or isinstance(cause, socket.error) and getattr(cause, 'errno', None) in transient_socket_errnos:
+            return 'transient'
+        if isinstance(cause, (UnavailableVideoError, UnsupportedError)) or isinstance(cause, ExtractorError) and cause.expected:
+            failure = 'unavailable' # (unless a network error is found further down the chain, ExtractorError also being "expected" for network errors)
+        # Moving to the cause of the current error (cf.: "exc_info" of DownloadError and "cause" of ExtractorError in https://github.com/ytdl-org/youtube-dl/blob/master/youtube_dl/utils.py)
+        exc_info = getattr(cause, 'exc_info', None)
+        if exc_info:
+            cause = exc_info[1]
+        else:
+            cause = getattr(cause, 'cause', None) or getattr(cause, '__cause__', None)
+
+    return failure
+
+
+def get_host(url):
+    """
+    Returns the host of a URL as keyed in host_concurrency_limits (e.g. "youtube.com" for "https://m.youtube.com/watch?v=..." or "https://youtu.be/...")
+    """
+
+    host_name = (urlparse(url).hostname or '').lower()
+    host = '.'.join(host_name.split('.')[-2:])
+
+    return host_aliases.get(host, host)
+
+
+@contextlib.contextmanager
+def host_slot(url):
+    """
+    Holds one of the concurrent download slots of the host of a URL (waiting for one to be released in case they are all taken, cf.: host_concurrency_limits)
+
+    Args:
+        url (str): The URL of the video
+    """
+
+    host = get_host(url)
+    with host_semaphores_lock:
+        if host not in host_semaphores:
+            host_semaphores[host] = threading.BoundedSemaphore(host_concurrency_limits.get(host, host_concurrency_limits['default']))
+    with host_semaphores[host]:
+        yield
+
+
+def normalize_url(url):
+    """
+    Normalizes a video URL into "<extractor>:<video id>" (e.g. "Youtube:FVGXaglgCVk"), so that the different URLs of a same video (youtu.be vs youtube.com, additional query parameters such as "igshid", etc.) share the same key
+    (The youtube_dl extractors are only matched against the URL, no request is made)
+
+    Args:
+        url (str): The URL of the video
+
+    Returns:
+        normalized_url (str): The normalized URL (or the URL itself in case no specific youtube_dl extractor recognizes it)
+    """
+
+    import youtube_dl # (pip install youtube_dl)
+
+    for ie in youtube_dl.extractor.gen_extractor_classes():
+        if ie.ie_key() != 'Generic' and ie.suitable(url):
+            try:
+                return '{0}:{1}'.format(ie.ie_key(), ie._match_id(url))
+            except Exception: # the URL pattern of the extractor has no "id" group
+                break
+
+    return url
+
+
+def read_index(index_path):
+    """
+    Reads a JSON index of the DMUS_DATA_DIRECTORY (e.g. the download cache index)
+
+    Args:
+        index_path (str): The absolute path of the index
+
+    Returns:
+        index (dict): The content of the index (an empty dictionary in case the index does not exist or is unreadable)
+    """
 
     try:
-        # Creating video object
-        video = moviepy.editor.VideoFileClip(video_file_path)
-        # Retrieving audio object from video object
-        audio = video.audio
-        # Composing absolute audio file path
-        audio_file_path = video_file_path.replace('.mp4', '.mp3')
-        # Writing audio file
-        audio.write_audiofile(audio_file_path, logger=None) # Cf.: "Moviepy still prints a progress bar even after setting `verbose` to `False`" (https://stackoverflow.com/questions/42695735/moviepy-still-prints-a-progress-bar-even-after-setting-verbose-to-false)
-        # Printing success message
-        print(' ✅ ".mp3" of "{0}" successfully extracted!'.format(video_file_path))
-        no_error *= 1
+        with io.open(index_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return {}
 
-    except Exception as e:
-        colored_error_message = colored('"{0}" could not be converted into ".mp3"!'.format(video_file_path), 'red', attrs=['reverse', 'blink'])
-        print(' ❌ ERROR! ' + colored_error_message + '\n Error message:\n  {0}'.format(e))
-        no_error *= 0
 
-    return no_error
+def write_index(index_path, index):
+    """
+    Writes a JSON index of the DMUS_DATA_DIRECTORY atomically (i.e. through a temporary file renamed over the index, so that a concurrent reader never sees a partially written index)
+
+    Args:
+        index_path (str): The absolute path of the index
+        index (dict): The content of the index
+    """
+
+    if not os.path.isdir(DMUS_DATA_DIRECTORY):
+        os.makedirs(DMUS_DATA_DIRECTORY)
+    temporary_file_descriptor, temporary_file_path = tempfile.mkstemp(dir=DMUS_DATA_DIRECTORY, suffix='.tmp')
+    with os.fdopen(temporary_file_descriptor, 'wb') as f:
+        f.write(json.dumps(index, indent=2, sort_keys=True).encode('utf-8'))
+    os.rename(temporary_file_path, index_path)
 
 
-def add_metadata(url, audio_file_path_list):
+def lookup_download_cache(url, profile_name, output_directory):
     """
-    Writes comment in metadata "Comments" part of file
+    Looks for the ".mp3" audio file(s) previously downloaded from a video URL with an output profile into an output directory
 
     Args:
-        url (str): The URL of the video(s)
+        url (str): The URL of the video
+        profile_name (str): The name of the output profile of the audio file(s)
+        output_directory (str): The directory in which the audio file(s) are expected
+
+    Returns:
+        audio_file_path_list (list): List containing the absolute file path(s) of the cached audio file(s), or None in case the URL is not cached (with this profile, in this output directory) or (one of) its audio file(s) was deleted or modified since (i.e. its size or modification time changed)
+    """
+
+    with index_lock:
+        entry = read_index(DOWNLOAD_CACHE_PATH).get(normalize_url(url))
+    if entry is None or entry.get('profile', 'mp3-v5') != profile_name: # (the entries written before the output profiles existed hold "mp3-v5" audio files)
+        return None
+    if entry.get('output_directory', os.path.abspath(DOWNLOAD_DIRECTORY)) != os.path.abspath(output_directory): # (the entries written before the output directory was recorded hold audio files of the DOWNLOAD_DIRECTORY)
+        return None
+
+    for audio_file in entry['audio_files']:
+        if not os.path.isfile(audio_file['path']) or os.path.getsize(audio_file['path']) != audio_file['size']:
+            return None
+        if 'mtime' in audio_file and os.path.getmtime(audio_file['path']) != audio_file['mtime']:
+            return None
+
+    return [audio_file['path'] for audio_file in entry['audio_files']]
+
+
+def store_download_cache(url, audio_file_path_list, profile_name, output_directory):
+    """
+    Records the ".mp3" audio file(s) downloaded from a video URL in the download cache index
+
+    Args:
+        url (str): The URL of the video
         audio_file_path_list (list): List containing the absolute file path(s) of the downloaded audio file(s)
+        profile_name (str): The name of the output profile of the audio file(s)
+        output_directory (str): The directory into which the audio file(s) were downloaded
     """
 
-    for audio_file_path in audio_file_path_list:
+    entry = {
+        'url': url,
+        'profile': profile_name,
+        'output_directory': os.path.abspath(output_directory),
+        'audio_files': [{'path': audio_file_path, 'size': os.path.getsize(audio_file_path), 'mtime': os.path.getmtime(audio_file_path)} for audio_file_path in audio_file_path_list],
+    }
+    normalized_url = normalize_url(url)
+
+    with index_lock:
+        download_cache = read_index(DOWNLOAD_CACHE_PATH)
+        download_cache[normalized_url] = entry
+        write_index(DOWNLOAD_CACHE_PATH, download_cache)
+
+
+def lookup_partial_downloads(url):
+    """
+    Looks for the ".part" file(s) left by an interrupted download of a video URL
+
+    Args:
+        url (str): The URL of the video
+
+    Returns:
+        part_file_list (list): List containing one dictionary ("path", "size" i.e. the bytes received so far, "total_bytes") per ".part" file still present on disk
+    """
+
+    with index_lock:
+        entry = read_index(PARTIAL_DOWNLOADS_PATH).get(normalize_url(url))
+    if entry is None:
+        return []
+
+    part_file_list = []
+    for part_file_path, part_file in sorted(entry['part_files'].items()):
+        if os.path.isfile(part_file_path):
+            part_file_list.append({'path': part_file_path, 'size': os.path.getsize(part_file_path), 'total_bytes': part_file['total_bytes']})
+
+    return part_file_list
+
+
+def store_partial_download(normalized_url, url, part_file_path, downloaded_bytes, total_bytes):
+    """
+    Checkpoints the progress of a ".part" file in the partial download index
+
+    Args:
+        normalized_url (str): The normalized URL of the video (cf.: normalize_url)
+        url (str): The URL of the video
+        part_file_path (str): The absolute path of the ".part" file
+        downloaded_bytes (int): The number of bytes received so far
+        total_bytes (int): The expected size of the file (None in case it is unknown)
+    """
+
+    with index_lock:
+        partial_downloads = read_index(PARTIAL_DOWNLOADS_PATH)
+        entry = partial_downloads.setdefault(normalized_url, {'url': url, 'part_files': {}})
+        entry['part_files'][part_file_path] = {'downloaded_bytes': downloaded_bytes, 'total_bytes': total_bytes, 'time': time.time()}
+        write_index(PARTIAL_DOWNLOADS_PATH, partial_downloads)
+
+
+def clear_partial_download(normalized_url, part_file_path):
+    """
+    Removes a completed ".part" file from the partial download index (and the video URL once all its ".part" files are completed)
+
+    Args:
+        normalized_url (str): The normalized URL of the video (cf.: normalize_url)
+        part_file_path (str): The absolute path of the ".part" file
+    """
+
+    with index_lock:
+        partial_downloads = read_index(PARTIAL_DOWNLOADS_PATH)
+        entry = partial_downloads.get(normalized_url)
+        if entry is None:
+            return
+        entry['part_files'].pop(part_file_path, None)
+        if not entry['part_files']:
+            del partial_downloads[normalized_url]
+        write_index(PARTIAL_DOWNLOADS_PATH, partial_downloads)
+
 
+def get_ffmpeg_binary():
+    """
+    Returns the path of the ffmpeg binary used by moviepy (resolving it on first call)
+
+    Returns:
+        FFMPEG_BINARY (str): The path of the ffmpeg binary
+    """
+
+    global FFMPEG_BINARY
+    if FFMPEG_BINARY is None:
+        from moviepy.config import get_setting # for getting the path of the ffmpeg binary used by moviepy
+        FFMPEG_BINARY = get_setting('FFMPEG_BINARY')
+
+    return FFMPEG_BINARY
+
+
+def audio_fingerprint(video_file_path):
+    """
+    Computes the fingerprint of the first audio stream of a video (or audio) file, i.e. the SHA-256 hash of its encoded audio packets (read with a stream copy, without decoding anything), so that the same audio stream is recognized whatever its container and the URL it was downloaded from
+
+    Args:
+        video_file_path (str): Video absolute file path
+
+    Returns:
+        fingerprint (str): The fingerprint of the audio stream, or None in case it could not be computed
+    """
+
+    command = [get_ffmpeg_binary(), '-v', 'error', '-i', video_file_path, '-map', '0:a:0', '-c', 'copy', '-f', 'hash', '-hash', 'sha256', '-']
+    with open(os.devnull, 'wb') as devnull: # (closed once ffmpeg exits, whatever happens)
         try:
-            # Writing comment in metadata "Comments" part of the current ".mp3" file
-            write_metadata_comment(audio_file_path, url)
+            output = subprocess.check_output(command, stderr=devnull)
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    match = re.search(r'SHA256=([0-9a-f]+)', output.decode('utf-8', 'replace'))
 
-        except Exception as e:
-            colored_error_message = colored('URL could NOT be written to metadata "Comments" part of "{0}"!'.format(audio_file_path), 'red', attrs=['reverse', 'blink'])
-            print(' ❌ ERROR! ' + colored_error_message + '\n Error message:\n  {0}'.format(e))
+    return match.group(1) if match else None
 
 
-def write_metadata_comment(file_path, comment):
+def profiled_fingerprint(fingerprint, profile_name):
     """
-    Writes comment in metadata "Comments" part of file (in case the operating system on which the program is running is macOS)
+    Returns the key of the audio fingerprint index for an audio stream extracted with an output profile (the same audio stream giving a different audio file with each profile)
 
     Args:
-        file_path (str): The absolute audio file path
-        comment (str): The comment to insert in the metadata "Comments" part of the audio file
+        fingerprint (str): The fingerprint of the source audio stream (or None)
+        profile_name (str): The name of the output profile
+
+    Returns:
+        (str): The key of the audio fingerprint index, or None in case the fingerprint is None
     """
 
-    if platform.system() == 'Darwin':
-        script = 'set comment of (POSIX file "{0}" as alias) to "{1}" as Unicode text'.format(file_path, comment) # cf.: "Try to define your string as unicode: u'Nom du professeur’" (https://www.odoo.com/forum/help-1/unicodedecodeerror-ascii-codec-can-t-decode-byte-0xc3-in-position-27-ordinal-not-in-range-128-20737)
-        applescript.tell.app("Finder", script.decode('utf-8'))
-    else:
-        print(colored("Error!", 'red'), 'Writing comment in metadata "Comments" part of file is currently ONLY supported for macOS.')
+    return '{0}:{1}'.format(fingerprint, profile_name) if fingerprint else None
 
 
-def notify(title, subtitle, message, sound_path):
+def lookup_audio_fingerprint(fingerprint):
     """
-    Posts macOS X notification
+    Looks for an existing ".mp3" audio file extracted from an audio stream with the given fingerprint
 
     Args:
-        title (str): The title
-        subtitle (str): The subtitle
-        message (str): The message
-        sound_path (str): The file path of the ".wav" audio file
+        fingerprint (str): The fingerprint of the source audio stream
+
+    Returns:
+        audio_file_path (str): The absolute file path of the existing audio file, or None in case there is none (anymore)
     """
 
-    # Playing sound
-    playsound(sound_path)
-    # Displaying the Desktop notification
-    t = '-title {!r}'.format(title)
-    s = '-subtitle {!r}'.format(subtitle)
-    m = '-message {!r}'.format(message)
-    os.system('terminal-notifier {}'.format(' '.join([m, t, s])))
+    with index_lock:
+        audio_file_path = read_index(AUDIO_FINGERPRINTS_PATH).get(fingerprint)
 
+    return audio_file_path if audio_file_path and os.path.isfile(audio_file_path) else None
 
-## Main process
 
-# Launching initial notification
-notify(title='dmus.py',
-       subtitle='Running dmus.py script to extract audio',
-       message='Audio extraction process started...',
-       sound_path=sound_path_start)
-
-
-if argsVid == 'clipboard': # this is True (i.e. argsVid == 'clipboard') only if debugModeOn is set to "False"
-    # 1) Retrieving stored clipboard value
-    print('\n1) Retrieving stored clipboard value')
-    clipboard_value = clipboard_get()
-else:
-    # 1) Retrieving the video argument (i.e. either a video URL or video file path)
-    print('\n1) Retrieving the video argument')
-    clipboard_value = argsVid
-print(' clipboard_value: {0}'.format(clipboard_value.encode('utf-8')))
-
-# 2) Identifying clipboard value (either video file path or URL)
-print('2) Identifying clipboard value...')
-
-# FILE PATH case
-if os.path.isfile(clipboard_value): # checking if the file exists on the computer (cf.: https://linuxize.com/post/python-check-if-file-exists/)
-    print(' ✅ Existence of the video file approved!')
-    video_file_path = clipboard_value
-
-    # 3) Extracting the ".mp3" audio file from the ".mp4" video file
-    print('3) Extracting the ".mp3" audio file from the ".mp4" video file')
-    no_error = extract_audio(video_file_path)
-
-    # 4) Posting macOS X notification
-    print('4) Posting macOS X notification')
-    parent_directory = Path(video_file_path).parent
-    notify(title='dmus.py',
-           subtitle='Audio file extracted :-)',
-           message='The ".mp3" audio file is available in {0}'.format(parent_directory),
-           sound_path=sound_path_success)
-    # Exiting the iTerm2 window
-    osascript.run('tell application "iTerm2" to close first window')
+def store_audio_fingerprint(fingerprint, audio_file_path):
+    """
+    Records the ".mp3" audio file extracted from an audio stream in the audio fingerprint index
+
+    Args:
+        fingerprint (str): The fingerprint of the source audio stream
+        audio_file_path (str): The absolute file path of the extracted audio file
+    """
+
+    with index_lock:
+        audio_fingerprints = read_index(AUDIO_FINGERPRINTS_PATH)
+        audio_fingerprints[fingerprint] = audio_file_path
+        write_index(AUDIO_FINGERPRINTS_PATH, audio_fingerprints)
+
 
-# URL case
-elif checkers.is_url(clipboard_value): # checking the validity of the URL (cf.: https://validator-collection.readthedocs.io/en/latest/checkers.html)
-    url = clipboard_value
-    print(' ✅ Validity of video URL approved!')
-    returned_value = 0
-    audio_file_path_list = []
+def link_duplicate_audio(fingerprint, audio_file_path, copy=False):
+    """
+    Hard-links the existing ".mp3" audio file extracted from the same audio stream (if any) to a new audio file path, instead of extracting the audio a second time
+
+    Args:
+        fingerprint (str): The fingerprint of the source audio stream (None is accepted and never matches)
+        audio_file_path (str): The absolute file path of the audio file to create
+        copy (bool): Whether to copy the existing audio file instead of hard-linking it, i.e. in case tags or comments are then written to the new audio file (a hard-linked file sharing its content and extended attributes with the existing one)
+
+    Returns:
+        existing_audio_file_path (str): The absolute file path of the linked existing audio file, or None in case no duplicate was found (or it could not be linked)
+    """
+
+    existing_audio_file_path = lookup_audio_fingerprint(fingerprint) if fingerprint else None
+    if existing_audio_file_path is None:
+        return None
+    if os.path.abspath(existing_audio_file_path) == os.path.abspath(audio_file_path):
+        return existing_audio_file_path
 
-    # 3) Downloading ".mp3" audio file(s) using youtube_dl in DOWNLOAD_DIRECTORY
-    print('3) Downloading ".mp3" audio file(s) using youtube_dl in {0}'.format(DOWNLOAD_DIRECTORY))
     try:
-        returned_value, audio_file_path_list = audio_downloader(url)
-    except Exception as e:
-        colored_error_message = colored('Audio download using youtube_dl failed... (Make sure you are connected to Internet!)', 'red', attrs=['reverse', 'blink'])
-        print('❌ ERROR! ' + colored_error_message + '\n Error message:\n  {0}'.format(e))
-        # Posting macOS X notification
-        notify(title='dmus.py',
-               subtitle='Audio download using youtube_dl failed :-(',
-               message='Make sure you are connected to Internet!',
-               sound_path=sound_path_fail)
-        # Exiting the iTerm2 window
-        osascript.run('tell application "iTerm2" to close first window')
-        # Exiting the program
-        exit(1)
-    if returned_value != 0:
-        colored_error_message = colored('Audio download using youtube_dl failed... (/!\ returned_value !=0) (Make sure you are connected to Internet!)', 'red', attrs=['reverse', 'blink'])
-        print('❌ ERROR! ' + colored_error_message)
-        # Posting macOS X notification
-        notify(title='dmus.py',
-               subtitle='Audio download using youtube_dl failed :-(',
-               message='Make sure you are connected to Internet!',
-               sound_path=sound_path_fail)
-        # Exiting the iTerm2 window
-        osascript.run('tell application "iTerm2" to close first window')
-        # Exiting the program
-        exit(1)
-
-    # 4) Writing URL to metadata "Comments" part of the downloaded ".mp3" file(s)
-    print('4) Writing URL to metadata "Comments" part of the downloaded ".mp3" file(s)')
-    add_metadata(url, audio_file_path_list)
-
-    # 5) Cleaning the name of the downloaded ".mp3" file(s)
-    print('5) Cleaning the name(s) of the downloaded ".mp3" file(s)')
-    for audio_file_path in audio_file_path_list:
-        audio_file_path_new = audio_file_path.split('.mp3')[0][0:len(audio_file_path)-16] + '.mp3'
-        os.rename(audio_file_path, audio_file_path_new)
-
-    # 6) Posting macOS X notification
-    print('6) Posting macOS X notification')
-    if len(audio_file_path_list) > 1:
-        subtitle = 'Audio files downloaded :-)'
-        message = 'The ".mp3" audio files are available in {0}'.format(DOWNLOAD_DIRECTORY)
-    else:
-        subtitle = 'Audio file downloaded :-)'
-        message = 'The ".mp3" audio file is available in {0}'.format(DOWNLOAD_DIRECTORY)
-    notify(title='dmus.py',
-           subtitle=subtitle,
-           message=message,
-           sound_path=sound_path_success)
-    # Exiting the iTerm2 window
-    osascript.run('tell application "iTerm2" to close first window')
-    # Exiting the program
-    exit(1)
+        if os.path.lexists(audio_file_path):
+            os.remove(audio_file_path)
+        if copy:
+            shutil.copyfile(existing_audio_file_path, audio_file_path) # (content only, the extended attributes holding the Finder comment of the existing audio file are not copied)
+        else:
+            os.link(existing_audio_file_path, audio_file_path)
+    except (IOError, OSError): # e.g. different file systems
+        return None
 
-# UNIDENTIFIED case
-else:
-    colored_error_message = colored('Invalid video path or URL...', 'red', attrs=['reverse', 'blink'])
-    print(' ❌ ERROR! ' + colored_error_message)
+    return existing_audio_file_path
 
-    # Posting macOS X notification
-    notify(title='dmus.py',
-           subtitle='Audio file extraction failed :-(',
-           message='Invalid video path or URL...',
-           sound_path=sound_path_fail)
-    # Exiting the iTerm2 window
-    osascript.run('tell application "iTerm2" to close first window')
-    # Exiting the program
-    exit(1)
\ No newline at end of file
+
+class JobWorkspace(object):
+    """
+    Workspace of a job, i.e. the temporary directory receiving its intermediate files (downloaded video(s), ".part" files, extracted audio file(s)) until its audio file(s) are moved, atomically, to their destination directory
+    The workspace of a video is always the same directory (named after its normalized URL or its absolute file path), so that a job resumes the ".part" file(s) left by an interrupted job for the same video: it is removed once the job completes, unless it still holds ".part" files
+    The job holds an exclusive lock on the lock file of its workspace (cf.: WORKSPACE_LOCK_FILE_NAME), so that a job processing the same video at the same time, in the same dmus process or in another one, works in a new temporary directory instead (which no other job ever resumes, so it is always removed once the job completes)
+    (Used as a context manager: "with JobWorkspace(url, DOWNLOAD_DIRECTORY) as workspace:")
+    """
+
+    def __init__(self, key, destination_directory, parent_directory=None):
+        self.key = key
+        self.destination_directory = destination_directory
+        self.parent_directory = parent_directory or WORKSPACE_DIRECTORY or tempfile.gettempdir()
+        self.path = None
+        self.resumable = True
+        self.lock_file = None
+
+    def __enter__(self):
+        path = os.path.join(self.parent_directory, 'dmus-job-' + hashlib.sha1(to_unicode(self.key).encode('utf-8')).hexdigest()[:16])
+        self.lock_file = lock_workspace(path)
+        self.resumable = self.lock_file is not None
+        if not self.resumable: # (the same video processed twice at the same time)
+            path = tempfile.mkdtemp(prefix='dmus-job-', dir=self.parent_directory)
+            self.lock_file = lock_workspace(path)
+        self.path = path
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if not self.resumable or not any(file_name.endswith('.part') for file_name in os.listdir(self.path)):
+                shutil.rmtree(self.path, ignore_errors=True) # (removed before the lock is released, so that no other job starts working in it in the meantime)
+        finally:
+            self.lock_file.close() # (releasing the lock)
+            self.lock_file = None
+        return False
+
+    def file_path(self, file_name):
+        """
+        Returns the absolute path of a file of the workspace
+        """
+
+        return os.path.join(self.path, file_name)
+
+    def publish(self, file_path, file_path_new=None):
+        """
+        Moves a finished file of the workspace to its destination (cf.: move_file)
+
+        Args:
+            file_path (str): The absolute path of the file in the workspace
+            file_path_new (str): The absolute path of the file at its destination (default: same file name in the destination directory)
+
+        Returns:
+            file_path_new (str): The absolute path of the file at its destination
+        """
+
+        if file_path_new is None:
+            file_path_new = os.path.join(self.destination_directory, os.path.basename(file_path))
+        move_file(file_path, file_path_new)
+
+        return file_path_new
+
+
+def lock_workspace(path):
+    """
+    Creates a workspace directory (unless it exists) and takes the exclusive lock of its lock file, without waiting (cf.: "fcntl.flock" in https://docs.python.org/3/library/fcntl.html)
+
+    Args:
+        path (str): The absolute path of the workspace
+
+    Returns:
+        lock_file (file): The open lock file holding the lock (released when it is closed), or None in case another job holds the lock
+    """
+
+    lock_file_path = os.path.join(path, WORKSPACE_LOCK_FILE_NAME)
+    while True:
+        try:
+            os.makedirs(path)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+        try:
+            lock_file = open(lock_file_path, 'ab')
+        except IOError as e:
+            if e.errno == errno.ENOENT: # (the workspace was removed in the meantime by the job which used it)
+                continue
+            raise
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except IOError as e:
+            lock_file.close()
+            if e.errno in (errno.EAGAIN, errno.EACCES, errno.EWOULDBLOCK):
+                return None
+            raise
+        # Making sure the workspace was not removed by the job which held the lock until now (the lock being then taken on a deleted lock file)
+        try:
+            if os.fstat(lock_file.fileno()).st_ino == os.stat(lock_file_path).st_ino:
+                return lock_file
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                lock_file.close()
+                raise
+        lock_file.close()
+
+
+def move_file(file_path, file_path_new):
+    """
+    Moves a file atomically, i.e. so that it never appears partially written at its new path: it is renamed in case both paths are on the same file system, and otherwise copied next to its new path under a temporary name and then renamed (cf.: "How to do atomic file replacement?" (https://stackoverflow.com/questions/7645338/how-to-do-atomic-file-replacement))
+
+    Args:
+        file_path (str): The current absolute file path
+        file_path_new (str): The new absolute file path (replaced in case it exists)
+    """
+
+    try:
+        os.rename(file_path, file_path_new)
+        return
+    except OSError as e:
+        if e.errno != errno.EXDEV: # (anything else than "Invalid cross-device link")
+            raise
+
+    file_descriptor, temporary_file_path = tempfile.mkstemp(prefix='.dmus-', suffix='.tmp', dir=os.path.dirname(file_path_new))
+    os.close(file_descriptor)
+    try:
+        shutil.copy2(file_path, temporary_file_path)
+        os.rename(temporary_file_path, file_path_new)
+    except Exception:
+        os.remove(temporary_file_path)
+        raise
+    os.remove(file_path)
+
+
+def publish_audio_file(workspace, audio_file_path, audio_file_path_new):
+    """
+    Moves an audio file from the workspace of its job to its destination, keeping the audio fingerprint index pointing to it
+
+    Args:
+        workspace (JobWorkspace): The workspace of the job
+        audio_file_path (str): The absolute file path of the audio file in the workspace
+        audio_file_path_new (str): The absolute file path of the audio file at its destination
+    """
+
+    workspace.publish(audio_file_path, audio_file_path_new)
+
+    with index_lock:
+        audio_fingerprints = read_index(AUDIO_FINGERPRINTS_PATH)
+        renamed_fingerprints = [fingerprint for fingerprint, path in audio_fingerprints.items() if path == audio_file_path]
+        for fingerprint in renamed_fingerprints:
+            audio_fingerprints[fingerprint] = audio_file_path_new
+        if renamed_fingerprints:
+            write_index(AUDIO_FINGERPRINTS_PATH, audio_fingerprints)
+
+
+def probe_audio_codec(video_file_path):
+    """
+    Identifies the codec of the first audio stream of a video file using ffmpeg (without decoding anything)
+
+    Args:
+        video_file_path (str): Video absolute file path
+
+    Returns:
+        audio_codec (str): The name of the audio codec (e.g. "aac", "mp3", "opus") or None in case no audio stream was found
+    """
+
+    process = subprocess.Popen([get_ffmpeg_binary(), '-hide_banner', '-i', video_file_path], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    _, stderr = process.communicate() # ffmpeg prints the streams description to stderr (and exits with an error since no output file is given)
+    match = re.search(r'Stream #\d+:\d+.*?: Audio: (\w+)', stderr.decode('utf-8', 'replace'))
+
+    return match.group(1) if match else None
+
+
+def get_audio_encoding(profile_name, audio_codec):
+    """
+    Determines the audio file format and the ffmpeg codec options giving, out of an audio stream, the audio file of an output profile (the same way as the youtube_dl audio extraction postprocessor, cf.: FFmpegExtractAudioPP in https://github.com/ytdl-org/youtube-dl/blob/master/youtube_dl/postprocessor/ffmpeg.py)
+
+    Args:
+        profile_name (str): The name of the output profile (cf.: audio_profiles)
+        audio_codec (str): The codec of the source audio stream (e.g. "aac", cf.: probe_audio_codec)
+
+    Returns:
+        extension (str): The extension of the audio file (e.g. ".m4a")
+        codec_options (list): The ffmpeg codec options (copying the audio stream as is whenever possible)
+    """
+
+    preferred_codec = audio_profiles[profile_name]['codec']
+    quality = audio_profiles[profile_name]['quality']
+
+    if preferred_codec == 'best' or preferred_codec == audio_codec or preferred_codec == 'm4a' and audio_codec == 'aac':
+        # Copying the audio stream as is
+        if audio_codec == 'aac':
+            return '.m4a', ['-c:a', 'copy']
+        if audio_codec in ['flac', 'mp3', 'opus', 'vorbis']:
+            return '.ogg' if audio_codec == 'vorbis' else '.' + audio_codec, ['-c:a', 'copy']
+        # Transcoding the other audio streams into MP3
+        preferred_codec = 'mp3'
+
+    extension = '.ogg' if preferred_codec == 'vorbis' else '.' + preferred_codec
+    if int(quality) < 10 and preferred_codec != 'opus': # (the opus encoder has no VBR level)
+        return extension, ['-c:a', audio_encoders[extension], '-q:a', quality]
+    return extension, ['-c:a', audio_encoders[extension], '-b:a', quality + 'k']
+
+
+def ffmpeg_extract_audio(video_file_path, audio_file_path, codec_options):
+    """
+    Writes the audio stream of a video file to an audio file with ffmpeg, only reading the audio stream (i.e. never decoding the video frames)
+
+    Args:
+        video_file_path (str): Video absolute file path
+        audio_file_path (str): Audio absolute file path
+        codec_options (list): The ffmpeg codec options (cf.: get_audio_encoding)
+
+    Returns:
+        returned_value (int): The ffmpeg return code ("0" in case the extraction succeeded)
+    """
+
+    command = [get_ffmpeg_binary(), '-y', '-loglevel', 'error', '-i', video_file_path, '-vn', '-map', '0:a:0'] + codec_options + [audio_file_path]
+
+    return subprocess.call(command)
+
+
+def extract_audio(video_file_path, profile_name=None, workspace=None):
+    """
+    Extracts ".mp3" audio file from a ".mp4" video file (or, more generally, the audio file of an output profile from a video file)
+    Cf.: https://www.codespeedy.com/extract-audio-from-video-using-python/
+
+    Args:
+        video_file_path (str): Video absolute file path
+        profile_name (str): The name of the output profile of the audio file (default: AUDIO_PROFILE)
+        workspace (JobWorkspace): The workspace of the job, in which the audio file is written before being moved next to the video file (default: None, i.e. directly written next to the video file)
+
+    Returns:
+        no_error (int): Number equal to "1" in case there is no error and "0" in case the conversion failed
+        audio_file_path (str): Audio absolute file path (None in case the conversion failed)
+    """
+
+    no_error = 1
+    profile_name = profile_name or AUDIO_PROFILE
+    audio_file_path = None
+
+    try:
+        # Composing absolute audio file path (its format depends on the codec of the audio stream for the profiles copying it)
+        try:
+            audio_codec = probe_audio_codec(video_file_path)
+        except OSError: # ffmpeg binary not found
+            audio_codec = None
+        extension, codec_options = get_audio_encoding(profile_name, audio_codec)
+        audio_file_path = os.path.splitext(video_file_path)[0] + extension
+        if audio_file_path == video_file_path:
+            audio_file_path = os.path.splitext(video_file_path)[0] + '-' + profile_name + extension
+        audio_file_path = os.path.abspath(audio_file_path)
+        # Hard-linking the audio file already extracted from the same audio stream with the same profile (if any)
+        fingerprint = profiled_fingerprint(audio_fingerprint(video_file_path), profile_name)
+        existing_audio_file_path = link_duplicate_audio(fingerprint, audio_file_path)
+        if existing_audio_file_path is not None:
+            print(' ♻️  Audio stream already extracted to "{0}", hard-linked instead of transcoded'.format(existing_audio_file_path.encode('utf-8')))
+        else:
+            # Extracting the audio stream directly with ffmpeg (stream copy or audio-only transcoding)
+            output_file_path = workspace.file_path(os.path.basename(audio_file_path)) if workspace else audio_file_path
+            try:
+                returned_value = ffmpeg_extract_audio(video_file_path, output_file_path, codec_options) if audio_codec is not None else 1
+            except OSError: # ffmpeg binary not found
+                returned_value = 1
+            if returned_value != 0:
+                # Falling back on moviepy (creating video object, retrieving audio object from video object and writing audio file)
+                import moviepy.editor # for extracting ".mp3" audio file from ".mp4" video file
+                video = moviepy.editor.VideoFileClip(video_file_path)
+                audio = video.audio
+                audio.write_audiofile(output_file_path, codec=audio_encoders[extension], logger=None) # Cf.: "Moviepy still prints a progress bar even after setting `verbose` to `False`" (https://stackoverflow.com/questions/42695735/moviepy-still-prints-a-progress-bar-even-after-setting-verbose-to-false)
+            if workspace:
+                workspace.publish(output_file_path, audio_file_path)
+            # Recording the fingerprint of the audio stream of the new audio file
+            if fingerprint:
+                store_audio_fingerprint(fingerprint, audio_file_path)
+        # Printing success message
+        print(' ✅ "{0}" of "{1}" successfully extracted!'.format(extension, to_native(video_file_path)))
+        no_error *= 1
+
+    except Exception as e:
+        colored_error_message = colored('"{0}" could not be converted into ".mp3"!'.format(to_native(video_file_path)), 'red', attrs=['reverse', 'blink'])
+        print(' ❌ ERROR! ' + colored_error_message + '\n Error message:\n  {0}'.format(to_native(error_message(e))))
+        no_error *= 0
+        audio_file_path = None
+
+    return no_error, audio_file_path
+
+
+def add_metadata(url, audio_file_path_list, finder_comments=True):
+    """
+    Writes comment in metadata "Comments" part of file (as ID3 comment of every ".mp3" file and, on macOS, as Finder comment of all the files at once)
+
+    Args:
+        url (str): The URL of the video(s)
+        audio_file_path_list (list): List containing the absolute file path(s) of the downloaded audio file(s)
+        finder_comments (bool): Boolean value to also write the Finder comments (cf.: add_finder_comments, the Finder comments being lost when a file is copied to another file system)
+    """
+
+    for audio_file_path in audio_file_path_list:
+
+        try:
+            # Writing comment in "Comments" tag of the current audio file (ID3 "Comments" frame of a ".mp3" file)
+            write_audio_comment(audio_file_path, url)
+
+        except Exception as e:
+            colored_error_message = colored('URL could NOT be written to metadata "Comments" part of "{0}"!'.format(to_native(audio_file_path)), 'red', attrs=['reverse', 'blink'])
+            print(' ❌ ERROR! ' + colored_error_message + '\n Error message:\n  {0}'.format(to_native(error_message(e))))
+
+    if finder_comments:
+        add_finder_comments(url, audio_file_path_list)
+
+
+def add_finder_comments(url, audio_file_path_list):
+    """
+    Writes comment in Finder "Comments" of all the files at once (on macOS only, cf.: write_finder_comments)
+
+    Args:
+        url (str): The URL of the video(s)
+        audio_file_path_list (list): List containing the absolute file path(s) of the downloaded audio file(s)
+    """
+
+    if write_finder_comments and audio_file_path_list and platform.system() == 'Darwin':
+
+        try:
+            # Writing comment in Finder "Comments" of (all) the ".mp3" file(s)
+            write_metadata_comments(audio_file_path_list, url)
+
+        except Exception as e:
+            colored_error_message = colored('URL could NOT be written to Finder "Comments" of {0}!'.format(audio_file_path_list), 'red', attrs=['reverse', 'blink'])
+            print(' ❌ ERROR! ' + colored_error_message + '\n Error message:\n  {0}'.format(to_native(error_message(e))))
+
+
+def to_unicode(value):
+    """
+    Decodes a UTF-8 byte string (Python 2 "str") into a unicode string, leaving unicode strings as they are
+    """
+
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def to_native(value):
+    """
+    Converts a unicode string into the native string type, i.e. a UTF-8 byte string on Python 2 (so that it can be printed whatever the encoding of the output, e.g. a pipe) and a unicode string on Python 3
+    """
+
+    if sys.version_info[0] == 2:
+        return value if isinstance(value, bytes) else value.encode('utf-8')
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def error_message(error):
+    """
+    Returns the message of an error as a unicode string, whatever the type of its arguments (a Python 2 error may hold a non-ASCII byte string or unicode string)
+    """
+
+    try:
+        return u'{0}'.format(error)
+    except UnicodeError: # (Python 2 error holding a non-ASCII string, that str() or unicode() cannot convert)
+        return u' '.join(to_unicode(argument) if isinstance(argument, bytes) else u'{0}'.format(argument) for argument in error.args)
+
+
+def write_audio_comment(file_path, comment):
+    """
+    Writes comment in the "Comments" tag of an audio file, whatever its format (ID3 "COMM" frame of ".mp3" files, "©cmt" atom of ".m4a" files and "COMMENT" field of the Vorbis comments of ".opus", ".ogg" and ".flac" files)
+
+    Args:
+        file_path (str): The absolute audio file path
+        comment (str): The comment to insert in the "Comments" tag of the audio file
+    """
+
+    if os.path.splitext(file_path)[1].lower() == '.mp3':
+        write_id3_comment(file_path, comment)
+        return
+
+    import mutagen # (pip install mutagen)
+    from mutagen.mp4 import MP4
+
+    audio = mutagen.File(file_path)
+    if audio is None:
+        raise ValueError('Unknown audio file format')
+    if audio.tags is None:
+        audio.add_tags()
+    audio.tags['\xa9cmt' if isinstance(audio, MP4) else 'comment'] = [to_unicode(comment)]
+    audio.save()
+
+
+def write_id3_comment(file_path, comment):
+    """
+    Writes comment in the ID3 "Comments" (COMM) frame of a ".mp3" file, directly in the file (works on any operating system)
+
+    Args:
+        file_path (str): The absolute audio file path
+        comment (str): The comment to insert in the ID3 "Comments" frame of the audio file
+    """
+
+    from mutagen.id3 import ID3, COMM, ID3NoHeaderError # (pip install mutagen)
+
+    try:
+        tags = ID3(file_path)
+    except ID3NoHeaderError:
+        tags = ID3()
+    tags.delall('COMM')
+    tags.add(COMM(encoding=3, lang='eng', desc=u'', text=[to_unicode(comment)])) # encoding=3: UTF-8
+    tags.save(file_path)
+
+
+def write_metadata_comments(file_path_list, comment):
+    """
+    Writes comment in Finder "Comments" of files with one single AppleScript call (i.e. one single Apple Event round trip whatever the number of files)
+
+    Args:
+        file_path_list (list): List containing the absolute audio file path(s)
+        comment (str): The comment to insert in the Finder "Comments" of the audio files
+    """
+
+    def quote(value):
+        return u'"{0}"'.format(to_unicode(value).replace(u'\\', u'\\\\').replace(u'"', u'\\"'))
+
+    script = u'\n'.join(u'set comment of (POSIX file {0} as alias) to {1} as Unicode text'.format(quote(file_path), quote(comment)) for file_path in file_path_list) # cf.: "Try to define your string as unicode: u'Nom du professeur’" (https://www.odoo.com/forum/help-1/unicodedecodeerror-ascii-codec-can-t-decode-byte-0xc3-in-position-27-ordinal-not-in-range-128-20737)
+    import applescript # (pip install applescript)
+    applescript.tell.app("Finder", script)
+
+
+@contextlib.contextmanager
+def timing_span(stage):
+    """
+    Times a stage of the pipeline and appends its record to the TIMINGS_LOG_PATH as a JSON line (fields: "stage", "job_id" and "source" of the job being processed by the current thread, "start" timestamp, "duration" in seconds, "bytes" processed and "outcome")
+
+    Args:
+        stage (str): The name of the stage (e.g. "download")
+
+    Yields:
+        record (dict): The record of the stage, in which the timed code may set "bytes" and "outcome" (by default "ok", or the exception type in case an exception is raised)
+    """
+
+    record = {
+        'stage': stage,
+        'job_id': getattr(timing_context, 'job_id', None),
+        'source': getattr(timing_context, 'source', None),
+        'pid': os.getpid(),
+        'start': time.time(),
+        'bytes': None,
+        'outcome': 'ok',
+    }
+    start_time = timer()
+    try:
+        yield record
+    except BaseException as e:
+        record['outcome'] = 'error: {0}'.format(type(e).__name__)
+        raise
+    finally:
+        record['duration'] = round(timer() - start_time, 6)
+        write_timing_record(record)
+
+
+def write_timing_record(record):
+    """
+    Appends a timing record to the TIMINGS_LOG_PATH (if any) as a JSON line (the write errors are ignored, timings must never break the pipeline)
+
+    Args:
+        record (dict): The timing record
+    """
+
+    if not TIMINGS_LOG_PATH:
+        return
+
+    try:
+        with timings_log_lock:
+            timings_log_directory = os.path.dirname(TIMINGS_LOG_PATH)
+            if timings_log_directory and not os.path.isdir(timings_log_directory):
+                os.makedirs(timings_log_directory)
+            with io.open(TIMINGS_LOG_PATH, 'ab') as f:
+                f.write(json.dumps(record, sort_keys=True).encode('utf-8') + b'\n')
+    except (IOError, OSError):
+        pass
+
+
+def total_file_size(file_path_list):
+    """
+    Returns the total size in bytes of the existing files of a list
+    """
+
+    return sum(os.path.getsize(file_path) for file_path in file_path_list if os.path.isfile(file_path))
+
+
+def notify_terminal_notifier(title, subtitle, message, sound_path):
+    """
+    Posts macOS X notification with terminal-notifier and plays its sound
+    """
+
+    # Displaying the Desktop notification (without waiting for it, so that it shows up while the sound plays)
+    subprocess.Popen([to_unicode(argument).encode('utf-8') for argument in ['terminal-notifier', '-message', message, '-title', title, '-subtitle', subtitle]])
+    # Playing sound
+    from playsound import playsound # for playing the notification sound
+    playsound(sound_path)
+
+
+def notify_notify_send(title, subtitle, message, sound_path):
+    """
+    Posts Linux desktop notification with notify-send (the sound is not played)
+    """
+
+    subprocess.call([to_unicode(argument).encode('utf-8') for argument in ['notify-send', title, u'{0}\n{1}'.format(to_unicode(subtitle), to_unicode(message))]])
+
+
+def notify_log(title, subtitle, message, sound_path):
+    """
+    Only prints the notification (e.g. on headless servers)
+    """
+
+    print('[{0}] {1} {2}'.format(to_native(title), to_native(subtitle), to_native(message)))
+
+
+def notify_none(title, subtitle, message, sound_path):
+    """
+    Drops the notification
+    """
+
+    pass
+
+
+# Notification backends (cf.: "--notifier")
+notification_backends = {
+    'terminal-notifier': notify_terminal_notifier,
+    'notify-send': notify_notify_send,
+    'log': notify_log,
+    'none': notify_none,
+}
+
+
+def get_notification_backend(name):
+    """
+    Returns the notification backend function of a given name ("auto" selecting terminal-notifier on macOS, notify-send on Linux desktops and log otherwise)
+
+    Args:
+        name (str): The name of the notification backend
+
+    Returns:
+        notification_backend (function): The notification backend function
+    """
+
+    if name == 'auto':
+        if platform.system() == 'Darwin':
+            name = 'terminal-notifier'
+        elif (os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY')) and any(os.access(os.path.join(directory, 'notify-send'), os.X_OK) for directory in os.environ.get('PATH', '').split(os.pathsep)):
+            name = 'notify-send'
+        else:
+            name = 'log'
+
+    return notification_backends[name]
+
+
+def notify(title, subtitle, message, sound_path):
+    """
+    Posts notification in a background thread (so that neither the sound nor the notifier delays the work), using the NOTIFICATION_BACKEND
+    (Call wait_for_notifications before exiting to make sure the pending notifications are delivered)
+
+    Args:
+        title (str): The title
+        subtitle (str): The subtitle
+        message (str): The message
+        sound_path (str): The file path of the ".wav" audio file
+    """
+
+    def post_notification():
+        try:
+            with timing_span('notification'):
+                get_notification_backend(NOTIFICATION_BACKEND)(title, subtitle, message, sound_path)
+        except Exception as e:
+            print(colored('Warning!', 'yellow'), 'The notification could not be posted ({0})'.format(to_native(error_message(e))))
+
+    thread = threading.Thread(target=post_notification)
+    thread.start()
+    pending_notifications.append(thread)
+
+
+def wait_for_notifications():
+    """
+    Waits until all the notifications posted so far are delivered
+    """
+
+    while pending_notifications:
+        pending_notifications.pop(0).join()
+
+
+def clipboard_get():
+    """
+    Returns the string situated in the clipboard (using "pbpaste" on macOS and "xclip" or "xsel" on Linux, which is much lighter than importing pandas for its clipboard support)
+
+    Returns:
+        clipboard_value (str): The string situated in the clipboard
+    """
+
+    if platform.system() == 'Darwin':
+        commands = [['pbpaste']]
+    else:
+        commands = [['xclip', '-selection', 'clipboard', '-out'], ['xsel', '--clipboard', '--output']]
+
+    environment = dict(os.environ, LANG='en_US.UTF-8') # making "pbpaste" output UTF-8 text
+    for command in commands:
+        try:
+            return subprocess.check_output(command, env=environment).decode('utf-8')
+        except (OSError, subprocess.CalledProcessError):
+            continue
+
+    raise RuntimeError('No clipboard command ({0}) could be run'.format(', '.join(command[0] for command in commands)))
+
+
+def is_url(clipboard_value):
+    """
+    Checks whether a string is a valid URL (cf.: https://validator-collection.readthedocs.io/en/latest/checkers.html)
+
+    Args:
+        clipboard_value (str): The string to check
+
+    Returns:
+        (bool): True in case the string is a valid URL
+    """
+
+    from validator_collection import checkers # to validate URLs (pip install validator-collection)
+
+    return checkers.is_url(clipboard_value)
+
+
+def read_video_arguments(batch_file):
+    """
+    Reads the video URLs and/or video file paths listed in a queue file (or in stdin)
+
+    Args:
+        batch_file (str): The path of the queue file (one video URL or video file path per line, "-" to read stdin)
+
+    Returns:
+        video_arguments (list): List containing the video URL(s) and/or video file path(s) as unicode strings (blank lines and lines starting with "#" are ignored)
+    """
+
+    if batch_file == '-':
+        lines = sys.stdin.readlines()
+    else:
+        with io.open(batch_file, 'rb') as f:
+            lines = f.readlines()
+
+    video_arguments = []
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.strip()
+        if line and not line.startswith('#'):
+            video_arguments.append(line)
+
+    return video_arguments
+
+
+def convert(source, options=None):
+    """
+    Retrieves the audio file(s) of a single video argument (i.e. either a video URL or a video file path), recording the timings of the job and of its stages under a new job identifier
+    This is the library API of dmus ("import dmus"): it neither parses the command line, nor posts notifications, nor exits, and several threads can call it at the same time (each job working in its own workspace, cf.: JobWorkspace)
+
+    Args:
+        source (str): The video URL or video file path
+        options (dict): The options of the conversion, overriding the default ones (cf.: convert_options), e.g. {'profile': 'aac', 'force': True}
+
+    Returns:
+        result (dict): The outcome of the conversion, i.e. "source", "success" (bool), "audio_files" (list containing the absolute file path(s) of the audio file(s)), "subtitle" and "message" (its description)
+
+    Raises:
+        ValueError: In case an option or the output profile is unknown
+    """
+
+    unknown_options = sorted(set(options or {}) - set(convert_options))
+    if unknown_options:
+        raise ValueError('Unknown option(s): {0}'.format(', '.join(unknown_options)))
+    options = dict(convert_options, **(options or {}))
+    source = to_unicode(source)
+    profile_name = options['profile'] or AUDIO_PROFILE
+    if profile_name not in audio_profiles:
+        raise ValueError('Unknown output profile: {0}'.format(profile_name))
+
+    timing_context.job_id = uuid.uuid4().hex
+    timing_context.source = source
+    try:
+        with timing_span('job') as span:
+            no_error, subtitle, message, audio_file_path_list = retrieve_audio(source, options['force'], profile_name, options['output_directory'] or DOWNLOAD_DIRECTORY)
+            span['outcome'] = 'ok' if no_error else 'failed'
+    finally:
+        timing_context.job_id = timing_context.source = None
+
+    return {'source': source, 'success': bool(no_error), 'audio_files': audio_file_path_list, 'subtitle': subtitle, 'message': message}
+
+
+def process_video(clipboard_value, force=False, profile_name=None):
+    """
+    Retrieves the ".mp3" audio file(s) of a single video argument with convert, summarizing the outcome the way the notifications, the job queue and the dmus daemon report it
+
+    Args:
+        clipboard_value (str): The video URL or video file path
+        force (bool): Whether to download the video again even if the download cache holds its ".mp3" audio file(s)
+        profile_name (str): The name of the output profile of the audio file(s) (default: AUDIO_PROFILE)
+
+    Returns:
+        no_error (int): Number equal to "1" in case there is no error and "0" in case the audio retrieval failed
+        subtitle (str): The subtitle of the notification summarizing the outcome
+        message (str): The message of the notification summarizing the outcome
+    """
+
+    result = convert(clipboard_value, {'force': force, 'profile': profile_name})
+
+    return int(result['success']), result['subtitle'], result['message']
+
+
+def retrieve_audio(clipboard_value, force, profile_name, output_directory):
+    """
+    Retrieves the ".mp3" audio file(s) of a single video argument (i.e. either a video URL or a video file path)
+
+    Args:
+        clipboard_value (str): The video URL or video file path
+        force (bool): Whether to download the video again even if the download cache holds its ".mp3" audio file(s)
+        profile_name (str): The name of the output profile of the audio file(s)
+        output_directory (str): The directory receiving the audio file(s) of a video URL (the audio file of a video file path being written next to it)
+
+    Returns:
+        no_error (int): Number equal to "1" in case there is no error and "0" in case the audio retrieval failed
+        subtitle (str): The subtitle of the notification summarizing the outcome
+        message (str): The message of the notification summarizing the outcome
+        audio_file_path_list (list): List containing the absolute file path(s) of the audio file(s)
+    """
+
+    print(' clipboard_value: {0}'.format(clipboard_value.encode('utf-8')))
+
+    # 2) Identifying clipboard value (either video file path or URL)
+    print('2) Identifying clipboard value...')
+    with timing_span('validation') as span:
+        is_file = os.path.isfile(clipboard_value) # checking if the file exists on the computer (cf.: https://linuxize.com/post/python-check-if-file-exists/)
+        is_valid_url = not is_file and is_url(clipboard_value) # checking the validity of the URL (cf.: https://validator-collection.readthedocs.io/en/latest/checkers.html)
+        span['outcome'] = 'file' if is_file else 'url' if is_valid_url else 'invalid'
+
+    # FILE PATH case
+    if is_file:
+        print(' ✅ Existence of the video file approved!')
+        video_file_path = clipboard_value
+
+        # 3) Extracting the ".mp3" audio file from the ".mp4" video file
+        print('3) Extracting the ".mp3" audio file from the ".mp4" video file')
+        set_current_job_state('extracting')
+        parent_directory = os.path.dirname(os.path.abspath(video_file_path))
+        with timing_span('extraction') as span, JobWorkspace(os.path.abspath(video_file_path), parent_directory) as workspace:
+            span['bytes'] = os.path.getsize(video_file_path)
+            no_error, audio_file_path = extract_audio(video_file_path, profile_name, workspace)
+            span['outcome'] = 'ok' if no_error else 'failed'
+
+        if not no_error:
+            return no_error, 'Audio file extraction failed :-(', u'"{0}" could not be converted into ".mp3"'.format(video_file_path), []
+        return no_error, 'Audio file extracted :-)', u'The ".mp3" audio file is available in {0}'.format(parent_directory), [audio_file_path]
+
+    # URL case
+    elif is_valid_url:
+        url = clipboard_value
+        print(' ✅ Validity of video URL approved!')
+        returned_value = 0
+        audio_file_path_list = []
+
+        # Looking for the ".mp3" audio file(s) of a previous download of the same video
+        with timing_span('cache_lookup') as span:
+            cached_audio_file_path_list = None if force else lookup_download_cache(url, profile_name, output_directory)
+            span['outcome'] = 'hit' if cached_audio_file_path_list else 'miss'
+        if cached_audio_file_path_list:
+            print(' ✅ Video already downloaded: {0}'.format(cached_audio_file_path_list))
+            if len(cached_audio_file_path_list) > 1:
+                return 1, 'Audio files already downloaded :-)', u'The ".mp3" audio files are available in {0}'.format(os.path.dirname(cached_audio_file_path_list[0])), cached_audio_file_path_list
+            return 1, 'Audio file already downloaded :-)', u'The ".mp3" audio file is available in {0}'.format(cached_audio_file_path_list[0]), cached_audio_file_path_list
+
+        # 3) Downloading ".mp3" audio file(s) using youtube_dl in the workspace of the job
+        with JobWorkspace(normalize_url(url), output_directory) as workspace:
+            print('3) Downloading ".mp3" audio file(s) using youtube_dl in {0}'.format(to_native(workspace.path)))
+            try:
+                with timing_span('download') as span:
+                    returned_value, audio_file_path_list, span['attempts'] = download_with_retries(url, profile_name, workspace.path, workspace.resumable) # (the ".part" file(s) of a temporary workspace are removed with it, so they are not checkpointed)
+                    span['bytes'] = total_file_size(audio_file_path_list)
+                    span['outcome'] = 'ok' if returned_value == 0 else 'failed'
+            except Exception as e:
+                if classify_download_failure(e) == 'unavailable':
+                    colored_error_message = colored('Video unavailable (removed, private, geo-blocked or unsupported)...', 'red', attrs=['reverse', 'blink'])
+                    print('❌ ERROR! ' + colored_error_message + '\n Error message:\n  {0}'.format(to_native(error_message(e))))
+                    return 0, 'Video unavailable :-(', 'The video was removed or cannot be accessed', []
+                colored_error_message = colored('Audio download using youtube_dl failed... (Make sure you are connected to Internet!)', 'red', attrs=['reverse', 'blink'])
+                print('❌ ERROR! ' + colored_error_message + '\n Error message:\n  {0}'.format(to_native(error_message(e))))
+                return 0, 'Audio download using youtube_dl failed :-(', 'Make sure you are connected to Internet!', []
+            if returned_value != 0:
+                colored_error_message = colored('Audio download using youtube_dl failed... (/!\ returned_value !=0) (Make sure you are connected to Internet!)', 'red', attrs=['reverse', 'blink'])
+                print('❌ ERROR! ' + colored_error_message)
+                return 0, 'Audio download using youtube_dl failed :-(', 'Make sure you are connected to Internet!', []
+
+            # 4) Writing URL to metadata "Comments" part of the downloaded ".mp3" file(s)
+            print('4) Writing URL to metadata "Comments" part of the downloaded ".mp3" file(s)')
+            set_current_job_state('tagging')
+            with timing_span('metadata') as span:
+                add_metadata(url, audio_file_path_list, finder_comments=False) # (written once the files are moved to the output directory)
+                span['bytes'] = total_file_size(audio_file_path_list)
+
+            # 5) Moving the downloaded ".mp3" file(s) to the output directory under a clean name
+            print('5) Moving the downloaded ".mp3" file(s) to {0} under a clean name'.format(to_native(output_directory)))
+            audio_file_path_new_list = []
+            with timing_span('rename'):
+                for audio_file_path in audio_file_path_list:
+                    audio_file_root, extension = os.path.splitext(os.path.basename(audio_file_path))
+                    audio_file_path_new = os.path.join(output_directory, audio_file_root[0:len(audio_file_root)-12] + extension) # (removing the "-<video id>" suffix)
+                    publish_audio_file(workspace, audio_file_path, audio_file_path_new)
+                    audio_file_path_new_list.append(audio_file_path_new)
+                add_finder_comments(url, audio_file_path_new_list)
+
+        # Recording the ".mp3" audio file(s) in the download cache
+        if audio_file_path_new_list:
+            try:
+                store_download_cache(url, audio_file_path_new_list, profile_name, output_directory)
+            except Exception as e:
+                print(colored('Warning!', 'yellow'), 'The download cache could not be updated ({0})'.format(to_native(error_message(e))))
+
+        if len(audio_file_path_list) > 1:
+            return 1, 'Audio files downloaded :-)', u'The ".mp3" audio files are available in {0}'.format(output_directory), audio_file_path_new_list
+        return 1, 'Audio file downloaded :-)', u'The ".mp3" audio file is available in {0}'.format(output_directory), audio_file_path_new_list
+
+    # UNIDENTIFIED case
+    else:
+        colored_error_message = colored('Invalid video path or URL...', 'red', attrs=['reverse', 'blink'])
+        print(' ❌ ERROR! ' + colored_error_message)
+        return 0, 'Audio file extraction failed :-(', 'Invalid video path or URL...', []
+
+
+def process_video_batch(video_arguments, jobs, pool=None, force=False, profile_name=None):
+    """
+    Retrieves the ".mp3" audio file(s) of several video arguments concurrently within the current process, through the job queue (the video arguments are queued as one batch of jobs, which the workers then claim one by one)
+
+    Args:
+        video_arguments (list): List containing the video URL(s) and/or video file path(s)
+        jobs (int): The maximum number of videos processed at the same time
+        pool (ThreadPool): A long-lived pool of threads to use (by default, a pool is created for the call and terminated afterwards)
+        force (bool): Whether to download the videos again even if the download cache holds their ".mp3" audio file(s)
+        profile_name (str): The name of the output profile of the audio files (default: AUDIO_PROFILE)
+
+    Returns:
+        results (list): List containing the (no_error, subtitle, message) tuple of each video argument (in the same order as video_arguments)
+    """
+
+    if not video_arguments:
+        return []
+
+    batch_id = enqueue_jobs(video_arguments, force, profile_name or AUDIO_PROFILE)
+    while True:
+        run_job_queue_workers(batch_id, min(jobs, len(video_arguments)), pool)
+        results = read_batch_results(batch_id)
+        if None not in results:
+            return results
+        # Waiting for the jobs of the batch claimed by other dmus processes (taking them back in case these processes died)
+        time.sleep(1)
+        requeue_stale_jobs()
+
+
+def resume_job_queue(jobs):
+    """
+    Processes the jobs left unfinished in the job queue (queued jobs and jobs of dead dmus processes), whatever their batch
+
+    Args:
+        jobs (int): The maximum number of videos processed at the same time
+
+    Returns:
+        processed_jobs (list): List containing the (video argument, (no_error, subtitle, message)) tuple of each processed job
+    """
+
+    requeue_stale_jobs()
+    with job_queue_connection() as connection:
+        number_of_jobs = connection.execute("SELECT COUNT(*) FROM jobs WHERE state = 'queued'").fetchone()[0]
+    print(' Resuming {0} unfinished job(s) of the job queue ({1} at a time)'.format(number_of_jobs, jobs))
+
+    return [(video_argument, result) for _, video_argument, result in run_job_queue_workers(None, min(jobs, max(1, number_of_jobs)))]
+
+
+def run_job_queue_workers(batch_id, workers, pool=None):
+    """
+    Runs job queue workers until there is no queued job left (in the current thread in case there is a single worker and no pool)
+
+    Args:
+        batch_id (str): The identifier of the batch of jobs to process (None: any batch)
+        workers (int): The number of workers
+        pool (ThreadPool): A long-lived pool of threads to use (by default, a pool is created for the call and terminated afterwards)
+
+    Returns:
+        processed_jobs (list): List containing the (job identifier, video argument, (no_error, subtitle, message)) tuple of each job processed by the workers
+    """
+
+    if pool is None and workers == 1:
+        return work_job_queue(batch_id)
+
+    if pool is not None:
+        return sum(pool.map(work_job_queue, [batch_id] * workers, chunksize=1), [])
+
+    pool = ThreadPool(processes=workers)
+    try:
+        processed_jobs = sum(pool.map(work_job_queue, [batch_id] * workers, chunksize=1), [])
+    finally:
+        pool.close()
+        pool.join()
+
+    return processed_jobs
+
+
+def work_job_queue(batch_id=None):
+    """
+    Job queue worker: claims the queued jobs one by one and processes them until there is no queued job left
+
+    Args:
+        batch_id (str): The identifier of the batch of jobs to process (None: any batch)
+
+    Returns:
+        processed_jobs (list): List containing the (job identifier, video argument, (no_error, subtitle, message)) tuple of each job processed by the worker
+    """
+
+    processed_jobs = []
+    while True:
+        job = claim_job(batch_id)
+        if job is None:
+            return processed_jobs
+        job_id, video_argument, force, profile_name = job
+
+        job_queue_context.job_id = job_id
+        result = None
+        try:
+            result = process_video(video_argument, force=force, profile_name=profile_name)
+        except Exception as e:
+            result = (0, 'Audio retrieval failed :-(', error_message(e))
+            colored_error_message = colored('"{0}" could not be processed!'.format(to_native(video_argument)), 'red', attrs=['reverse', 'blink'])
+            print(' ❌ ERROR! ' + colored_error_message + '\n Error message:\n  {0}'.format(to_native(result[2])))
+        finally:
+            job_queue_context.job_id = None
+            if result is not None: # (a job interrupted without result, e.g. with Ctrl-C, stays active so that it is resumed by the next run)
+                finish_job(job_id, result)
+        processed_jobs.append((job_id, video_argument, result))
+
+
+@contextlib.contextmanager
+def job_queue_connection():
+    """
+    Opens a connection to the job queue (creating it on first use), in autocommit mode so that every statement outside an explicit transaction is committed right away
+
+    Yields:
+        connection (sqlite3.Connection): The connection to the job queue, closed afterwards
+    """
+
+    if not os.path.isdir(DMUS_DATA_DIRECTORY):
+        os.makedirs(DMUS_DATA_DIRECTORY)
+    connection = sqlite3.connect(JOB_QUEUE_PATH, timeout=30, isolation_level=None)
+    try:
+        connection.execute('PRAGMA journal_mode = WAL') # (the readers do not block the writer, cf.: https://www.sqlite.org/wal.html)
+        connection.execute('''CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            batch_id TEXT NOT NULL,
+            video_argument TEXT NOT NULL,
+            force INTEGER NOT NULL,
+            state TEXT NOT NULL,
+            worker TEXT,
+            no_error INTEGER,
+            subtitle TEXT,
+            message TEXT,
+            created REAL NOT NULL,
+            updated REAL NOT NULL,
+            profile TEXT)''')
+        connection.execute('CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id)')
+        if 'profile' not in [row[1] for row in connection.execute('PRAGMA table_info(jobs)')]: # (job queue created before the output profiles existed)
+            connection.execute('ALTER TABLE jobs ADD COLUMN profile TEXT')
+        yield connection
+    finally:
+        connection.close()
+
+
+def get_worker_id():
+    """
+    Returns the identifier of the current dmus process as recorded in the "worker" column of the job queue (i.e. "<host name>:<process id>")
+    """
+
+    return '{0}:{1}'.format(socket.gethostname(), os.getpid())
+
+
+def enqueue_jobs(video_arguments, force=False, profile_name=None):
+    """
+    Queues one job per video argument as a new batch of the job queue (and drops the jobs finished for more than job_retention seconds)
+
+    Args:
+        video_arguments (list): List containing the video URL(s) and/or video file path(s)
+        force (bool): Whether to download the videos again even if the download cache holds their ".mp3" audio file(s)
+        profile_name (str): The name of the output profile of the audio files (default: AUDIO_PROFILE)
+
+    Returns:
+        batch_id (str): The identifier of the new batch
+    """
+
+    batch_id = uuid.uuid4().hex
+    now = time.time()
+    with job_queue_connection() as connection:
+        connection.execute('BEGIN IMMEDIATE')
+        connection.execute('DELETE FROM jobs WHERE state IN (?, ?) AND updated < ?', finished_job_states + [now - job_retention])
+        connection.executemany("INSERT INTO jobs (batch_id, video_argument, force, profile, state, created, updated) VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+                               [(batch_id, to_unicode(video_argument), int(force), profile_name or AUDIO_PROFILE, now, now) for video_argument in video_arguments])
+        connection.execute('COMMIT')
+
+    return batch_id
+
+
+def claim_job(batch_id=None):
+    """
+    Claims the oldest queued job (of a batch), atomically, so that two workers never process the same job
+
+    Args:
+        batch_id (str): The identifier of the batch of the job to claim (None: any batch)
+
+    Returns:
+        job (tuple): The (job identifier, video argument, force, output profile name) tuple of the claimed job, or None in case there is no queued job left
+    """
+
+    with job_queue_connection() as connection:
+        connection.execute('BEGIN IMMEDIATE') # (taking the write lock before reading, so that no other worker can claim the same job in the meantime)
+        if batch_id is None:
+            row = connection.execute("SELECT id, video_argument, force, profile FROM jobs WHERE state = 'queued' ORDER BY id LIMIT 1").fetchone()
+        else:
+            row = connection.execute("SELECT id, video_argument, force, profile FROM jobs WHERE state = 'queued' AND batch_id = ? ORDER BY id LIMIT 1", (batch_id,)).fetchone()
+        if row is not None:
+            connection.execute('UPDATE jobs SET state = ?, worker = ?, updated = ? WHERE id = ?', (active_job_states[0], get_worker_id(), time.time(), row[0]))
+        connection.execute('COMMIT')
+
+    if row is None:
+        return None
+
+    return row[0], row[1], bool(row[2]), row[3] if row[3] in audio_profiles else None
+
+
+def set_current_job_state(state):
+    """
+    Records the new active state (cf.: active_job_states) of the job processed by the current thread, if any, in the job queue
+    """
+
+    job_id = getattr(job_queue_context, 'job_id', None)
+    if job_id is None:
+        return
+
+    try:
+        with job_queue_connection() as connection:
+            connection.execute('UPDATE jobs SET state = ?, updated = ? WHERE id = ?', (state, time.time(), job_id))
+    except sqlite3.Error as e:
+        print(colored('Warning!', 'yellow'), 'The job queue could not be updated ({0})'.format(e))
+
+
+def finish_job(job_id, result):
+    """
+    Records the result of a job in the job queue ("done" or "failed" state)
+
+    Args:
+        job_id (int): The identifier of the job
+        result (tuple): The (no_error, subtitle, message) tuple of the job
+    """
+
+    no_error, subtitle, message = result
+    with job_queue_connection() as connection:
+        connection.execute('UPDATE jobs SET state = ?, no_error = ?, subtitle = ?, message = ?, updated = ? WHERE id = ?',
+                           (finished_job_states[0] if no_error else finished_job_states[1], no_error, subtitle, message, time.time(), job_id))
+
+
+def read_batch_results(batch_id):
+    """
+    Reads the results of the jobs of a batch from the job queue
+
+    Args:
+        batch_id (str): The identifier of the batch
+
+    Returns:
+        results (list): List containing the (no_error, subtitle, message) tuple of each job of the batch (in the order of their video arguments), None standing for the jobs not finished yet
+    """
+
+    with job_queue_connection() as connection:
+        rows = connection.execute('SELECT state, no_error, subtitle, message FROM jobs WHERE batch_id = ? ORDER BY id', (batch_id,)).fetchall()
+
+    return [(no_error, subtitle, message) if state in finished_job_states else None for state, no_error, subtitle, message in rows]
+
+
+def requeue_stale_jobs():
+    """
+    Queues again the active jobs of the dmus processes of this computer that are no longer running (e.g. a batch stopped with Ctrl-C or a closed iTerm2 window), so that they are resumed instead of being lost
+    """
+
+    host_name = socket.gethostname()
+    with job_queue_connection() as connection:
+        connection.execute('BEGIN IMMEDIATE')
+        workers = [row[0] for row in connection.execute('SELECT DISTINCT worker FROM jobs WHERE state IN (?, ?, ?)', active_job_states)]
+        for worker in workers:
+            worker_host_name, _, pid = worker.rpartition(':')
+            if worker_host_name == host_name and not is_process_running(int(pid)):
+                connection.execute("UPDATE jobs SET state = 'queued', worker = NULL, updated = ? WHERE worker = ? AND state IN (?, ?, ?)", [time.time(), worker] + active_job_states)
+        connection.execute('COMMIT')
+
+
+def is_process_running(pid):
+    """
+    Checks whether a process is running (cf.: "How to check if there exists a process with a given pid in Python?" (https://stackoverflow.com/questions/568271/how-to-check-if-there-exists-a-process-with-a-given-pid-in-python))
+    """
+
+    try:
+        os.kill(pid, 0)
+    except OSError as e:
+        return e.errno == errno.EPERM
+
+    return True
+
+
+class ThreadingUnixStreamServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+
+class DaemonRequestHandler(StreamRequestHandler):
+    """
+    Handles one connection to the dmus daemon: reads a JSON line containing the video arguments and answers with a JSON line containing their results
+    """
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline().decode('utf-8'))
+            print('\nJob received: {0}'.format([video_argument.encode('utf-8') for video_argument in request['video_arguments']]))
+            results = process_video_batch(request['video_arguments'], self.server.jobs, self.server.pool, force=request.get('force', False), profile_name=request.get('profile'))
+            response = {'results': results}
+        except Exception as e: # (answering anyway, so that the client falls back on processing the videos itself instead of waiting for the results)
+            response = {'error': error_message(e)}
+            print(colored('Error!', 'red'), 'The job could not be processed ({0})'.format(to_native(response['error'])))
+        self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+
+def serve(jobs):
+    """
+    Runs the dmus daemon, which listens on SOCKET_PATH (local connections only) and processes the submitted videos with a long-lived pool of threads (so that the imported packages and the youtube_dl engines stay warm between the jobs)
+
+    Args:
+        jobs (int): The maximum number of videos processed at the same time
+    """
+
+    # Removing the socket left by a daemon that did not exit properly (and refusing to start if a daemon is actually running)
+    if os.path.exists(SOCKET_PATH):
+        if submit_to_daemon([]) is not None:
+            print(colored('Error!', 'red'), 'A dmus daemon is already listening on {0}'.format(SOCKET_PATH))
+            exit(1)
+        os.remove(SOCKET_PATH)
+
+    # Warming up the pipeline
+    import youtube_dl # (pip install youtube_dl)
+    import moviepy.editor # for extracting ".mp3" audio file from ".mp4" video file
+    get_ffmpeg_binary()
+
+    previous_umask = os.umask(0o077) # making the socket only accessible to the current user
+    try:
+        server = ThreadingUnixStreamServer(SOCKET_PATH, DaemonRequestHandler)
+    finally:
+        os.umask(previous_umask)
+    server.jobs = jobs
+    server.pool = ThreadPool(processes=jobs)
+    print('dmus daemon listening on {0} ({1} video(s) at a time)'.format(SOCKET_PATH, jobs))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.pool.close()
+        os.remove(SOCKET_PATH)
+
+
+def submit_to_daemon(video_arguments, force=False, profile_name=None):
+    """
+    Submits video arguments to the dmus daemon and waits for their results
+    (The video file paths are made absolute beforehand, the dmus daemon resolving relative paths against its own working directory)
+
+    Args:
+        video_arguments (list): List containing the video URL(s) and/or video file path(s)
+        force (bool): Whether to download the videos again even if the download cache holds their ".mp3" audio file(s)
+        profile_name (str): The name of the output profile of the audio files (default: the one of the dmus daemon)
+
+    Returns:
+        results (list): List containing the (no_error, subtitle, message) tuple of each video argument, or None in case no dmus daemon is running (or it could not process the video arguments, or did not answer in time, cf.: daemon_connect_timeout and daemon_response_timeout)
+    """
+
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+
+    video_arguments = [os.path.abspath(video_argument) if os.path.isfile(video_argument) else video_argument for video_argument in video_arguments]
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.settimeout(daemon_connect_timeout)
+        client.connect(SOCKET_PATH)
+        client.settimeout(daemon_response_timeout * max(1, len(video_arguments))) # (the dmus daemon only answers once all the video arguments are processed)
+        client.sendall(json.dumps({'video_arguments': video_arguments, 'force': force, 'profile': profile_name}).encode('utf-8') + b'\n')
+        response = client.makefile('rb').readline()
+    except socket.timeout: # (e.g. a dmus daemon stuck on a download, its jobs then running alongside the ones of the current process in their own workspace, cf.: JobWorkspace)
+        print(colored('Warning!', 'yellow'), 'The dmus daemon listening on {0} did not answer in time, processing the video argument(s) within the current process'.format(SOCKET_PATH))
+        return None
+    except socket.error:
+        return None
+    finally:
+        client.close()
+
+    try:
+        return [tuple(result) for result in json.loads(response.decode('utf-8'))['results']]
+    except (ValueError, KeyError, TypeError): # empty or error response (e.g. the dmus daemon stopped while processing the video arguments)
+        print(colored('Warning!', 'yellow'), 'The dmus daemon listening on {0} could not process the video argument(s), processing them within the current process'.format(SOCKET_PATH))
+        return None
+
+
+## Main process
+
+def parse_arguments(argv=None):
+    """
+    Parses the command line arguments of "dmus.py", applying the configurations they override (notification backend, output profile, retries, timings log and workspace directory)
+
+    Args:
+        argv (list): The command line arguments (default: sys.argv[1:])
+
+    Returns:
+        args (argparse.Namespace): The parsed arguments
+    """
+
+    global NOTIFICATION_BACKEND, AUDIO_PROFILE, DOWNLOAD_RETRIES, TIMINGS_LOG_PATH, WORKSPACE_DIRECTORY
+
+    if not debugModeOn:
+        parser = ArgumentParser(description='"dmus.py" is a Python program that\
+            allows to retrieve the ".mp3" audio file from either a video URL or a video file path.\
+            The software currently supports videos hosted on at least following platforms: \
+            YouTube, Instagram. In case a video doesn\'t come from one of the above-mentioned \
+            websites, the program might not work and the ".mp3" audio file might not be retrieved.')
+        parser.add_argument('--vid', metavar='/my/video/url/or/file/path', type=str, action='append', default=None, help='extract the ".mp3" audio content of the video url or video file path (can be repeated to process several videos in one run)')
+        parser.add_argument('--batch-file', metavar='/my/queue/file', type=str, default=None, help='read the video urls and/or video file paths to process from a file (one per line, "-" to read them from stdin)')
+        parser.add_argument('--jobs', metavar='N', type=int, default=4, help='maximum number of videos processed concurrently in batch mode (default: 4)')
+        parser.add_argument('--serve', action='store_true', help='run the dmus daemon, which keeps the pipeline warm and processes the videos submitted by the next "dmus.py" runs')
+        parser.add_argument('--profile', choices=sorted(audio_profiles), default=AUDIO_PROFILE, help='output profile of the audio file(s) (default: "{0}", "fastest" avoiding transcoding whenever possible)'.format(AUDIO_PROFILE))
+        parser.add_argument('--force', action='store_true', help='download the video(s) again even if the download cache holds their ".mp3" audio file(s)')
+        parser.add_argument('--retries', metavar='N', type=int, default=DOWNLOAD_RETRIES, help='number of times a download failing for a transient reason (network failure, rate limiting, server error) is retried, with exponential backoff (default: {0})'.format(DOWNLOAD_RETRIES))
+        parser.add_argument('--notifier', choices=['auto', 'terminal-notifier', 'notify-send', 'log', 'none'], default=NOTIFICATION_BACKEND, help='notification backend (default: "auto", i.e. terminal-notifier on macOS, notify-send on Linux desktops and log otherwise)')
+        parser.add_argument('--timings-log', metavar='/my/timings.jsonl', type=str, default=TIMINGS_LOG_PATH, help='JSON lines file receiving the timing of every stage of every job (default: {0}, "" to disable)'.format(TIMINGS_LOG_PATH))
+        parser.add_argument('--resume', action='store_true', help='also process the jobs left unfinished in the job queue by a stopped run (e.g. a batch interrupted with Ctrl-C)')
+        parser.add_argument('--workspace-dir', metavar='/my/workspace/directory', type=str, default=WORKSPACE_DIRECTORY, help='directory in which every job writes its intermediate files before moving its audio file(s) to {0} (default: the system temporary directory, e.g. "/dev/shm" to keep them in memory)'.format(DOWNLOAD_DIRECTORY))
+        parser.add_argument('--no-daemon', action='store_true', help='process the video(s) within the current process even if the dmus daemon is running')
+        args = parser.parse_args(argv)
+        args.vid = args.vid if args.vid else ['clipboard']
+        args.jobs = max(1, args.jobs)
+        NOTIFICATION_BACKEND = args.notifier
+        AUDIO_PROFILE = args.profile
+        DOWNLOAD_RETRIES = max(0, args.retries)
+        TIMINGS_LOG_PATH = args.timings_log
+        WORKSPACE_DIRECTORY = args.workspace_dir
+        args.process_options = [option for option, dest in [('--retries', 'retries'), ('--timings-log', 'timings_log'), ('--workspace-dir', 'workspace_dir')] if getattr(args, dest) != parser.get_default(dest)] # (the options only applying to the current process, i.e. not to the videos processed by the dmus daemon)
+    else: # in case we are in "debug mode"
+        args = Namespace(vid=['video information required'], batch_file=None, jobs=1, serve=False, no_daemon=True, force=False, resume=False, process_options=[])
+
+    return args
+
+
+def main(argv=None):
+    """
+    Command line interface of "dmus.py": retrieves the ".mp3" audio file(s) of the video argument(s) (clipboard, "--vid" or "--batch-file"), either through the dmus daemon or within the current process (cf.: process_video_batch), and notifies the outcome
+
+    Args:
+        argv (list): The command line arguments (default: sys.argv[1:])
+
+    Returns:
+        exit_code (int): "0" in case all the video(s) were successfully converted and "1" otherwise
+    """
+
+
+    ## Parsing the input argument
+    args = parse_arguments(argv)
+    argsVids = args.vid
+    argsBatchFile = args.batch_file
+    argsJobs = args.jobs
+    argsServe = args.serve
+    argsNoDaemon = args.no_daemon
+    argsForce = args.force
+    argsResume = args.resume
+    argsProcessOptions = args.process_options
+
+
+    ## Tests (hard-coded clipboard_value examples)
+    if argsVids == ['video information required']:
+        #--- FILE PATH
+        # ✅ Absolute file path of existing video:
+        #argsVids = [project_path + '/tests/test-vid.mp4']
+        # ✅ Absolute file path of nonexistent video:
+        #argsVids = [project_path + '/tests/tada.mp4']
+        #--- YOUTUBE
+        # ✅ URL of YouTube video resulting in a ".mp4" file if downloaded using the below youtube-dl options
+        #argsVids = ['https://www.youtube.com/watch?v=1vnnFYTZGRI']
+        # ✅ URL of YouTube video
+        #argsVids = ['https://www.youtube.com/watch?v=UIrGxHhdqXo']
+        # ✅ URL of YouTube video
+        #argsVids = ['https://www.youtube.com/watch?v=A_H8t0OqyQ0']
+        # ✅ URL of YouTube video presenting encoding problem for writing metadata ("UnicodeDecodeError: 'ascii' codec can't decode byte 0xc3 in position 26: ordinal not in range(128)")
+        # (YouTube video called "MØ - When I Was Young (Lyrics _ Lyric Video)")
+        argsVids = ['https://www.youtube.com/watch?v=FVGXaglgCVk']
+        # ✅ URL of YouTube video that is NO MORE available
+        #argsVids = ['https://youtu.be/UjrlC9mGCD']
+        #--- INSTAGRAM
+        # ✅ URL of Instagram post containing SEVERAL Instagram videos:
+        #argsVids = ['https://www.instagram.com/p/B_-gogqAtuU/?igshid=1pjsrn7we7kdu']
+        # ✅ URL of Instagram post containing ONE single Instagram video:
+        #argsVids = ['https://www.instagram.com/p/B_3hd-kDVpq/?igshid=r8fbjeekqiv7']
+        # ✅ URL of Instagram post containing only ".jpg" files (the program then returns no error but works fine, no video is downloaded and nothing bad happens):
+        #argsVids = ['https://www.instagram.com/p/BxCvRcalCsi/']
+        # ✅ URL of Instagram post that is NO MORE available
+        #argsVids = ['https://instagram.com/p/B-VHAIzpd57/']
+
+
+    ## Procedure
+
+    # DAEMON case
+    if argsServe:
+        serve(argsJobs)
+        return 0
+
+    # Launching initial notification
+    notify(title='dmus.py',
+           subtitle='Running dmus.py script to extract audio',
+           message='Audio extraction process started...',
+           sound_path=sound_path_start)
+
+
+    if argsVids == ['clipboard']: # this is True (i.e. argsVids == ['clipboard']) only if debugModeOn is set to "False" and no video argument was provided
+        if argsResume and argsBatchFile is None:
+            # 1) Only resuming the unfinished jobs of the job queue
+            print('\n1) Resuming the unfinished jobs of the job queue')
+            video_arguments = []
+        elif argsBatchFile is not None:
+            # 1) Retrieving the video arguments listed in the batch file
+            print('\n1) Retrieving the video arguments listed in {0}'.format(argsBatchFile))
+            video_arguments = read_video_arguments(argsBatchFile)
+        else:
+            # 1) Retrieving stored clipboard value
+            print('\n1) Retrieving stored clipboard value')
+            with timing_span('clipboard'):
+                video_arguments = [clipboard_get()]
+    else:
+        # 1) Retrieving the video argument(s) (i.e. either video URL(s) or video file path(s))
+        print('\n1) Retrieving the video argument(s)')
+        video_arguments = argsVids
+        if argsBatchFile is not None:
+            video_arguments = video_arguments + read_video_arguments(argsBatchFile)
+    video_arguments = [to_unicode(video_argument) for video_argument in video_arguments] # (the command line arguments being UTF-8 byte strings on Python 2)
+
+    # Submitting the video argument(s) to the dmus daemon (in case it is running) or processing them within the current process
+    # (The dmus daemon applies its own retries, timings log and workspace directory, so the video argument(s) are processed within the current process in case one of these options is given)
+    results = None if argsNoDaemon or argsProcessOptions else submit_to_daemon(video_arguments, force=argsForce, profile_name=AUDIO_PROFILE)
+    if results is not None:
+        print(' Video argument(s) processed by the dmus daemon listening on {0}'.format(SOCKET_PATH))
+    else:
+        if len(video_arguments) > 1:
+            print(' Processing {0} video arguments ({1} at a time)'.format(len(video_arguments), argsJobs))
+        results = process_video_batch(video_arguments, argsJobs, force=argsForce, profile_name=AUDIO_PROFILE)
+
+    # Processing the jobs left unfinished by the previous runs
+    if argsResume:
+        resumed_jobs = resume_job_queue(argsJobs)
+        video_arguments = video_arguments + [video_argument for video_argument, _ in resumed_jobs]
+        results = results + [result for _, result in resumed_jobs]
+
+    # SINGLE video case
+    if len(results) == 1:
+        no_error, subtitle, message = results[0]
+
+    # BATCH case
+    else:
+        number_of_successes = sum(result[0] for result in results)
+        no_error = int(number_of_successes == len(results))
+        subtitle = 'Batch processed :-)' if no_error else 'Batch processed with errors :-('
+        message = '{0}/{1} video(s) successfully converted into ".mp3" (in {2} and next to the video files)'.format(number_of_successes, len(results), DOWNLOAD_DIRECTORY)
+        for video_argument, (video_no_error, video_subtitle, video_message) in zip(video_arguments, results):
+            print(' {0} {1}: {2}'.format('✅' if video_no_error else '❌', to_native(video_argument), to_native(video_message)))
+
+    # Posting macOS X notification
+    print('Posting macOS X notification')
+    notify(title='dmus.py',
+           subtitle=subtitle,
+           message=message,
+           sound_path=sound_path_success if no_error else sound_path_fail)
+    # Waiting for the notifications to be delivered and exiting the iTerm2 window
+    wait_for_notifications()
+    import osascript
+    osascript.run('tell application "iTerm2" to close first window')
+    # Exiting the program
+    return 0 if no_error else 1
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,103 @@
+#!/usr/local/bin/python2.7
+# coding: utf-8
+
+
+# test_unicode_arguments.py
+# Regression tests of the video arguments containing non-ASCII characters (e.g. "/my/videos/café.mp4"), which the job queue returns as unicode strings on Python 2
+# (Run from the project directory with "python -m unittest discover tests" or "python -m pytest tests")
+
+
+## Required packages
+import os
+import sys
+import shutil
+import sqlite3
+import tempfile
+import unittest
+import subprocess
+try:
+    from shutil import which
+except ImportError:
+    from distutils.spawn import find_executable as which
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dmus
+
+
+## Tests
+
+class UnicodeArgumentsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='dmus-test-')
+        self.saved_configurations = dict((name, getattr(dmus, name)) for name in ['DMUS_DATA_DIRECTORY', 'DOWNLOAD_CACHE_PATH', 'AUDIO_FINGERPRINTS_PATH', 'PARTIAL_DOWNLOADS_PATH', 'JOB_QUEUE_PATH', 'TIMINGS_LOG_PATH', 'WORKSPACE_DIRECTORY', 'FFMPEG_BINARY', 'process_video'])
+        dmus.DMUS_DATA_DIRECTORY = os.path.join(self.directory, '.dmus')
+        dmus.DOWNLOAD_CACHE_PATH = os.path.join(dmus.DMUS_DATA_DIRECTORY, 'download_cache.json')
+        dmus.AUDIO_FINGERPRINTS_PATH = os.path.join(dmus.DMUS_DATA_DIRECTORY, 'audio_fingerprints.json')
+        dmus.PARTIAL_DOWNLOADS_PATH = os.path.join(dmus.DMUS_DATA_DIRECTORY, 'partial_downloads.json')
+        dmus.JOB_QUEUE_PATH = os.path.join(dmus.DMUS_DATA_DIRECTORY, 'jobs.sqlite')
+        dmus.TIMINGS_LOG_PATH = ''
+        dmus.WORKSPACE_DIRECTORY = self.directory
+
+    def tearDown(self):
+        for name, value in self.saved_configurations.items():
+            setattr(dmus, name, value)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def job_states(self):
+        connection = sqlite3.connect(dmus.JOB_QUEUE_PATH)
+        try:
+            return [row[0] for row in connection.execute('SELECT state FROM jobs ORDER BY id')]
+        finally:
+            connection.close()
+
+    def test_failed_job_is_finished(self):
+        def process_video(clipboard_value, force=False, profile_name=None):
+            raise IOError(u'"{0}" could not be read'.format(clipboard_value))
+        dmus.process_video = process_video
+
+        results = dmus.process_video_batch([u'/nonexistent/caf\xe9.mp4'], 1)
+
+        self.assertEqual(results, [(0, u'Audio retrieval failed :-(', u'"/nonexistent/caf\xe9.mp4" could not be read')])
+        self.assertEqual(self.job_states(), ['failed'])
+
+    def test_invalid_video_argument(self):
+        results = dmus.process_video_batch([u'/nonexistent/caf\xe9.mp4'], 1)
+
+        self.assertEqual(results[0][0], 0)
+        self.assertEqual(self.job_states(), ['failed'])
+
+    @unittest.skipIf(which('ffmpeg') is None, 'ffmpeg not found')
+    def test_video_file_extraction(self):
+        dmus.FFMPEG_BINARY = which('ffmpeg')
+        video_file_path = os.path.join(self.directory, u'caf\xe9.mp4')
+        subprocess.check_call([dmus.FFMPEG_BINARY, '-loglevel', 'error', '-f', 'lavfi', '-i', 'sine=duration=1', '-c:a', 'aac', video_file_path.encode('utf-8') if sys.version_info[0] == 2 else video_file_path])
+
+        results = dmus.process_video_batch([video_file_path], 1)
+
+        self.assertEqual(results, [(1, u'Audio file extracted :-)', u'The ".mp3" audio file is available in {0}'.format(self.directory))])
+        self.assertTrue(os.path.isfile(os.path.join(self.directory, u'caf\xe9.mp3')))
+        self.assertEqual(self.job_states(), ['done'])
+
+    @unittest.skipIf(which('ffmpeg') is None, 'ffmpeg not found')
+    def test_utf8_byte_string_source(self):
+        dmus.FFMPEG_BINARY = which('ffmpeg')
+        video_file_path = os.path.join(self.directory, u'caf\xe9.mp4').encode('utf-8') # (e.g. a command line argument on Python 2)
+        subprocess.check_call([dmus.FFMPEG_BINARY, '-loglevel', 'error', '-f', 'lavfi', '-i', 'sine=duration=1', '-c:a', 'aac', video_file_path])
+
+        result = dmus.convert(video_file_path)
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['source'], video_file_path.decode('utf-8'))
+        self.assertEqual(result['audio_files'], [os.path.join(self.directory, u'caf\xe9.mp3')])
+
+    def test_batch_file(self):
+        batch_file = os.path.join(self.directory, 'queue.txt')
+        with open(batch_file, 'wb') as f:
+            f.write(u'# Queue\n/my/videos/caf\xe9.mp4\n\nhttps://www.youtube.com/watch?v=FVGXaglgCVk\n'.encode('utf-8'))
+
+        self.assertEqual(dmus.read_video_arguments(batch_file), [u'/my/videos/caf\xe9.mp4', u'https://www.youtube.com/watch?v=FVGXaglgCVk'])
+
+
+if __name__ == '__main__':
+    unittest.main()